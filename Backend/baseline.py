@@ -0,0 +1,117 @@
+import csv
+
+import numpy as np
+
+BASELINE_CSV_PATH = "baseline.csv"
+
+# Mapping between nutrient total keys (food.csv columns) and baseline nutrient names
+NUTRIENT_MAPPING = {
+    'Data.Carbohydrate': 'Carbohydrates',
+    'Data.Cholesterol': 'Cholesterol',
+    'Data.Choline': 'Choline',
+    'Data.Fiber': 'Fiber',
+    'Data.Manganese': 'Manganese',
+    'Data.Vitamin B3': 'Vitamin B3',
+    'Data.Vitamin B5': 'Vitamin B5',
+    'Data.Protein': 'Protein',
+    'Data.Vitamin B2': 'Vitamin B2',
+    'Data.Selenium': 'Selenium',
+    'Data.Sugar Total': 'Sugar',
+    'Data.Vitamin B1': 'Vitamin B1',
+    'Data.Fat.Total Lipid': 'Fats',
+    'Data.Major Minerals.Calcium': 'Calcium',
+    'Data.Major Minerals.Copper': 'Copper',
+    'Data.Major Minerals.Iron': 'Iron',
+    'Data.Major Minerals.Magnesium': 'Magnesium',
+    'Data.Major Minerals.Phosphorus': 'Phosphorus',
+    'Data.Major Minerals.Potassium': 'Potassium',
+    'Data.Major Minerals.Sodium': 'Sodium',
+    'Data.Major Minerals.Zinc': 'Zinc',
+    'Data.Vitamin A ': 'Vitamin A',
+    'Data.Vitamins.Vitamin B12': 'Vitamin B12',
+    'Data.Vitamins.Vitamin B6': 'Vitamin B6',
+    'Data.Vitamins.Vitamin C': 'Vitamin C',
+    'Data.Vitamins.Vitamin E': 'Vitamin E',
+    'Data.Vitamins.Vitamin K': 'Vitamin K'
+}
+
+
+def _number(value):
+    value = (value or '').strip()
+    return float(value) if value else np.nan
+
+
+def age_group(age):
+    """Map an age to the baseline.csv age group: C(hild), A(dult) or O(lder)."""
+    if 3 <= age <= 15:
+        return "C"
+    elif 16 <= age <= 50:
+        return "A"
+    return "O"  # 51-90, and the fallback
+
+
+class BaselineTable:
+    """RDA baseline and UL per (gender, age group), as arrays in NUTRIENT_MAPPING order.
+
+    Missing values are NaN, so comparisons against them are simply False.
+    """
+
+    def __init__(self, csv_path=BASELINE_CSV_PATH, columns=None):
+        self.keys = list(NUTRIENT_MAPPING)
+        self.names = [NUTRIENT_MAPPING[key] for key in self.keys]
+        # Positions of the mapped nutrients in a nutrient matrix row, when columns are given
+        self.column_index = np.array([list(columns).index(key) for key in self.keys]) if columns is not None else None
+
+        position = {name: i for i, name in enumerate(self.names)}
+        self.groups = {}
+        with open(csv_path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                i = position.get(row['Nutrient'])
+                if i is None:
+                    continue
+                key = (row['Gender'], row['Age'])
+                if key not in self.groups:
+                    self.groups[key] = (
+                        np.full(len(self.names), np.nan),
+                        np.full(len(self.names), np.nan),
+                        np.zeros(len(self.names), dtype=bool),
+                    )
+                baseline, ul, present = self.groups[key]
+                baseline[i] = _number(row['Baseline'])
+                ul[i] = _number(row['UL'])
+                present[i] = True
+
+    def lookup(self, gender, age):
+        """(baseline, ul, present) arrays for a user, or None for an unknown group."""
+        return self.groups.get((gender, age_group(age)))
+
+    def status_vector(self, values, baseline, ul):
+        """-1 below baseline, 1 above UL, 0 otherwise; works on one row or a 2-D batch."""
+        return np.where(values < baseline, -1, np.where(values > ul, 1, 0))
+
+    def values_from_totals(self, totals):
+        return np.array([totals.get(key, 0) for key in self.keys], dtype=np.float64)
+
+    def gaps(self, gender, age, totals):
+        """(gap, room) arrays for a user, or None for an unknown group.
+
+        gap is what is still needed to reach baseline (0 where met or unknown);
+        room is what is left below UL (NaN where there is no UL).
+        """
+        group = self.lookup(gender, age)
+        if group is None:
+            return None
+        baseline, ul, present = group
+        values = self.values_from_totals(totals)
+        gap = np.where(present, np.maximum(np.nan_to_num(baseline - values, nan=0.0), 0.0), 0.0)
+        room = np.maximum(ul - values, 0.0)
+        return gap, room
+
+    def analyze(self, gender, age, totals):
+        """Status per baseline nutrient name for a Data.* keyed totals dict."""
+        group = self.lookup(gender, age)
+        if group is None:
+            return {}
+        baseline, ul, present = group
+        status = self.status_vector(self.values_from_totals(totals), baseline, ul)
+        return {name: int(s) for name, s, p in zip(self.names, status, present) if p}
@@ -0,0 +1,74 @@
+"""Event-loop latency during a login storm: inline bcrypt vs the password pool.
+
+Fires concurrent password verifications while a ticker coroutine measures
+how late each of its short sleeps wakes up. With bcrypt inline the ticker
+stalls behind every hash; on the pool its lag should stay near zero. Run
+from the Backend directory:
+
+    python -m benchmarks.login_bench
+    python -m benchmarks.login_bench --logins 200 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+TICK_SECONDS = 0.005
+
+
+async def ticker(lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((loop.time() - start - TICK_SECONDS) * 1000)
+
+
+async def storm(login, logins):
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    assert all(results), "a verification failed"
+    lags.sort()
+    return {
+        "logins/s": logins / elapsed,
+        "lag p50 ms": lags[len(lags) // 2],
+        "lag p99 ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+        "lag max ms": lags[-1],
+    }
+
+
+async def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--logins", type=int, default=64)
+    arg_parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost (sets BCRYPT_ROUNDS)")
+    args = arg_parser.parse_args()
+
+    # The password module reads its settings at import
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    import passwords
+
+    passwords.start()
+    hashed = await passwords.hash_password("correct horse battery staple")
+
+    async def inline_login():
+        return passwords.pwd_context.verify("correct horse battery staple", hashed)
+
+    async def pooled_login():
+        return await passwords.verify_password("correct horse battery staple", hashed)
+
+    print(f"{args.logins} concurrent logins, bcrypt cost {args.rounds}, {passwords.PASSWORD_WORKERS} workers")
+    print(f"{'':8}{'logins/s':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for name, login in (("inline", inline_login), ("pool", pooled_login)):
+        result = await storm(login, args.logins)
+        print(f"{name:8}" + "".join(f"{value:>{12 if i else 10}.1f}" for i, value in enumerate(result.values())))
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
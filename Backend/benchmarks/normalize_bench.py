@@ -0,0 +1,72 @@
+"""Microbenchmark for the parser's text normalization.
+
+Compares the old per-regex implementation against TextNormalizer and checks
+that both produce the same output. Run from the Backend directory:
+
+    python -m benchmarks.normalize_bench
+"""
+import re
+import time
+
+from parser import NutritionParser
+
+ITEMS = [
+    "2 cups of rice", "2 cup bhat", "murgi curry", "daal", "some almonds", "2 breads",
+    "jam", "1 plate khichuri", "3 pieces roti", "100g gorur mangsho", "1.5 bowls dal",
+    "2 tbsp chini", "half cup dudh", "1 slice cheese", "2 dim bhaja", "aloo bhuna",
+]
+
+
+def legacy_preprocess(parser, text):
+    text = text.lower()
+    for bangla_word, english_word in parser.bangla_food_mapping.items():
+        text = re.sub(r'\b' + bangla_word + r'\b', english_word, text)
+    return re.sub(r'[^\w\s\.]', ' ', text)
+
+
+def legacy_split(parser, phrase):
+    quantity_info = {'amount': 1.0, 'unit': 'serving'}
+    for pattern, (unit, _) in parser.quantity_patterns.items():
+        match = re.search(pattern, phrase, re.IGNORECASE)
+        if match:
+            if unit != 'some':
+                quantity_info = {'amount': float(match.group(1)) if match.group(1) else 1.0, 'unit': unit}
+            break
+    description = phrase
+    for pattern in parser.quantity_patterns.keys():
+        description = re.sub(pattern, '', description, flags=re.IGNORECASE)
+    description = re.sub(r'\b\d+(?:\.\d+)?\b', '', description)
+    return quantity_info, ' '.join(description.split())
+
+
+def legacy(parser, item):
+    return legacy_split(parser, legacy_preprocess(parser, item))
+
+
+def compiled(parser, item):
+    return parser.normalizer.split_quantity(parser.normalizer.normalize(item))
+
+
+def per_item_us(fn, parser, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in ITEMS:
+            fn(parser, item)
+    return (time.perf_counter() - start) / (rounds * len(ITEMS)) * 1e6
+
+
+def main(rounds=2000):
+    parser = NutritionParser('food_selected.csv')
+    for item in ITEMS:
+        assert legacy(parser, item) == compiled(parser, item), item
+
+    before = per_item_us(legacy, parser, rounds)
+    after = per_item_us(compiled, parser, rounds)
+    print(f"items: {len(ITEMS)} x {rounds} rounds")
+    print(f"legacy:   {before:8.2f} us/item")
+    print(f"compiled: {after:8.2f} us/item")
+    print(f"speedup:  {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
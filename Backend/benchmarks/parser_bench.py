@@ -0,0 +1,161 @@
+"""Accuracy and speed benchmark for NutritionParser over a fixed meal-log corpus.
+
+Times each pipeline stage (normalize, match, convert, aggregate), reports
+items/sec and per-log p50/p99 latency, and scores matches against the
+corpus. Run offline from the Backend directory:
+
+    python -m benchmarks.parser_bench
+    python -m benchmarks.parser_bench --save bench_results.json
+    python -m benchmarks.parser_bench --baseline bench_results.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from catalog import FoodCatalog
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "parser_corpus_v1.json")
+STAGES = ("normalize", "match", "convert", "aggregate")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_log(catalog, user_input, stage_times, use_cache):
+    parser = catalog.parser
+    clock = time.perf_counter
+
+    start = clock()
+    food_items = parser.extract_food_items(user_input)
+    stage_times["normalize"] += clock() - start
+
+    start = clock()
+    if use_cache:
+        matches = [parser.find_best_match(item['description'])[0] for item in food_items]
+    else:
+        rows = [parser.match_row(item['description'])[0] for item in food_items]
+        matches = [parser.df.iloc[row] if row is not None else None for row in rows]
+    stage_times["match"] += clock() - start
+
+    start = clock()
+    log_data = {}
+    for item, match in zip(food_items, matches):
+        if match is not None:
+            nutrient_id, entry = parser.build_log_entry(item, match)
+            log_data[nutrient_id] = entry
+    stage_times["convert"] += clock() - start
+
+    start = clock()
+    catalog.nutrients.totals(log_data)
+    stage_times["aggregate"] += clock() - start
+    return log_data, len(food_items)
+
+
+def score(corpus, results):
+    expected_items = matched_items = exact_logs = 0
+    gram_errors = []
+    for log in corpus["logs"]:
+        actual = results[log["id"]]
+        expected = log["expected"]
+        expected_items += len(expected)
+        for ndb, entry in expected.items():
+            if ndb in actual:
+                matched_items += 1
+                gram_errors.append(abs(actual[ndb]["amount_gm"] - entry["amount_gm"]))
+        if set(actual) == set(expected) and all(
+                actual[ndb]["amount_gm"] == entry["amount_gm"] for ndb, entry in expected.items()):
+            exact_logs += 1
+    return {
+        "match_accuracy": matched_items / expected_items if expected_items else 1.0,
+        "exact_log_accuracy": exact_logs / len(corpus["logs"]),
+        "mean_gram_error": statistics.fmean(gram_errors) if gram_errors else 0.0,
+    }
+
+
+def run(corpus, rounds, use_cache):
+    start = time.perf_counter()
+    catalog = FoodCatalog()
+    load_seconds = time.perf_counter() - start
+
+    stage_times = dict.fromkeys(STAGES, 0.0)
+    latencies = []
+    items = 0
+    results = {}
+    for _ in range(rounds):
+        for log in corpus["logs"]:
+            start = time.perf_counter()
+            results[log["id"]], count = run_log(catalog, log["input"], stage_times, use_cache)
+            latencies.append(time.perf_counter() - start)
+            items += count
+
+    total = sum(latencies)
+    return {
+        "corpus_version": corpus["version"],
+        "logs": len(corpus["logs"]),
+        "rounds": rounds,
+        "catalog_load_ms": load_seconds * 1000,
+        "items_per_sec": items / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "stage_ms": {stage: seconds * 1000 / len(latencies) for stage, seconds in stage_times.items()},
+        **score(corpus, results),
+        "mismatches": [log["id"] for log in corpus["logs"] if results[log["id"]] != log["expected"]],
+    }
+
+
+def print_report(report, baseline=None):
+    def line(label, key, fmt):
+        value = report[key]
+        text = f"{label:<22}{format(value, fmt):>12}"
+        if baseline and key in baseline:
+            text += f"   ({format(value - baseline[key], '+' + fmt)})"
+        print(text)
+
+    print(f"corpus v{report['corpus_version']}: {report['logs']} logs x {report['rounds']} rounds")
+    line("catalog load (ms)", "catalog_load_ms", ".1f")
+    line("items/sec", "items_per_sec", ".1f")
+    line("p50 per log (ms)", "p50_ms", ".3f")
+    line("p99 per log (ms)", "p99_ms", ".3f")
+    for stage in STAGES:
+        value = report["stage_ms"][stage]
+        text = f"  {stage + ' (ms/log)':<20}{value:>12.3f}"
+        if baseline:
+            text += f"   ({value - baseline['stage_ms'][stage]:+.3f})"
+        print(text)
+    line("match accuracy", "match_accuracy", ".3f")
+    line("exact log accuracy", "exact_log_accuracy", ".3f")
+    line("mean gram error", "mean_gram_error", ".2f")
+    if report["mismatches"]:
+        print("logs differing from corpus:", ", ".join(report["mismatches"]))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--cache", action="store_true", help="go through the match cache")
+    arg_parser.add_argument("--save", help="write the report as JSON")
+    arg_parser.add_argument("--baseline", help="earlier --save output to diff against")
+    args = arg_parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    report = run(corpus, args.rounds, args.cache)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Shopping list: greedy baseline vs the branch-and-bound cover solver.
+
+Draws random deficiency sets and budgets, then reports weighted coverage,
+cost and latency for both strategies, plus latency of the quantity LP on
+random partial intakes. Run from the Backend directory:
+
+    python -m benchmarks.shopping_bench
+"""
+import argparse
+import random
+import statistics
+import time
+
+from baseline import BaselineTable
+from models.user_nutrition import ALLOWED_NUTRIENTS
+from nutrients import NutrientMatrix
+from shopping_solver import PriceCatalog, greedy_select, load_food_items, nutrient_weights, optimal_select
+
+
+def coverage(selected, weights):
+    covered = {n for item in selected for n in item["nutrients"]}
+    return sum(w for n, w in weights.items() if n in covered)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--cases", type=int, default=500)
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    food_items = load_food_items()
+    stats = {"greedy": {"coverage": [], "cost": [], "ms": []}, "optimal": {"coverage": [], "cost": [], "ms": []}}
+    better = cheaper = 0
+    for _ in range(args.cases):
+        deficient = rng.sample(ALLOWED_NUTRIENTS, rng.randint(1, len(ALLOWED_NUTRIENTS)))
+        budget = rng.choice([100, 200, 300, 500, 800, 1000, 1500, 3000])
+        weights = nutrient_weights(deficient)
+
+        greedy, greedy_ms = timed(greedy_select, food_items, deficient, budget)
+        (optimal, _), optimal_ms = timed(optimal_select, food_items, deficient, budget)
+        for name, selected, ms in (("greedy", greedy, greedy_ms), ("optimal", optimal, optimal_ms)):
+            stats[name]["coverage"].append(coverage(selected, weights) / sum(weights.values()))
+            stats[name]["cost"].append(sum(item["price"] for item in selected))
+            stats[name]["ms"].append(ms)
+
+        g, o = stats["greedy"]["coverage"][-1], stats["optimal"]["coverage"][-1]
+        assert o >= g - 1e-9, "solver covered less than greedy"
+        better += o > g + 1e-9
+        cheaper += abs(o - g) <= 1e-9 and stats["optimal"]["cost"][-1] < stats["greedy"]["cost"][-1]
+
+    print(f"{args.cases} cases, {len(food_items)} priced items")
+    print(f"{'':10}{'coverage':>10}{'cost':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, s in stats.items():
+        ms = sorted(s["ms"])
+        print(f"{name:10}{statistics.fmean(s['coverage']):>10.3f}{statistics.fmean(s['cost']):>10.1f}"
+              f"{ms[len(ms) // 2]:>10.3f}{ms[min(len(ms) - 1, int(len(ms) * 0.99))]:>10.3f}")
+    print(f"solver covers more: {better}/{args.cases}; same coverage for less: {cheaper}/{args.cases}")
+
+    nutrients = NutrientMatrix.from_csv("food.csv")
+    baseline = BaselineTable(columns=nutrients.columns)
+    prices = PriceCatalog(food_items, nutrients, baseline)
+    ms, open_gaps = [], 0
+    for _ in range(args.cases):
+        gender, age = rng.choice("MF"), rng.randint(3, 90)
+        base, _, _ = baseline.lookup(gender, age)
+        # Each nutrient somewhere between nothing eaten and 1.5x baseline
+        totals = {key: rng.uniform(0, 1.5) * b for key, b in zip(baseline.keys, base) if b == b}
+        gap, room = baseline.gaps(gender, age, totals)
+        plan, plan_ms = timed(prices.quantity_plan, gap, room, rng.choice([None, 50, 100, 300]))
+        ms.append(plan_ms)
+        open_gaps += bool(plan["shortfall"])
+    ms.sort()
+    print(f"quantity LP: p50 {ms[len(ms) // 2]:.3f} ms, p99 {ms[min(len(ms) - 1, int(len(ms) * 0.99))]:.3f} ms, "
+          f"plans with a shortfall: {open_gaps}/{args.cases}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+from datetime import datetime
+
+from baseline import BASELINE_CSV_PATH, BaselineTable
+from nutrients import NutrientMatrix
+from shopping_solver import PRICES_CSV_PATH, PriceCatalog
+from parser import NutritionParser
+
+FOOD_SELECTED_CSV_PATH = "food_selected.csv"
+FOOD_CSV_PATH = "food.csv"
+
+
+class FoodCatalog:
+    """Food data shared by every request. Treat it as read-only; use reload_catalog() to swap it."""
+
+    def __init__(self, selected_csv_path=FOOD_SELECTED_CSV_PATH, food_csv_path=FOOD_CSV_PATH,
+                 baseline_csv_path=BASELINE_CSV_PATH, prices_csv_path=PRICES_CSV_PATH):
+        self.selected_csv_path = selected_csv_path
+        self.food_csv_path = food_csv_path
+        self.baseline_csv_path = baseline_csv_path
+        self.prices_csv_path = prices_csv_path
+        # Parser state: food_selected.csv, stopwords and lookup tables
+        self.parser = NutritionParser(selected_csv_path)
+        # Nutrient table: food.csv, nutrients per 100 g keyed by NDB number
+        self.nutrients = NutrientMatrix.from_csv(food_csv_path)
+        self.nutrient_columns = self.nutrients.columns
+        # RDA/UL arrays per (gender, age group), aligned to the nutrient matrix columns
+        self.baseline = BaselineTable(baseline_csv_path, self.nutrient_columns)
+        # Shopping price list as nutrient/item bitmasks, plus nutrients per kg for quantity plans
+        self.prices = PriceCatalog.from_csv(prices_csv_path, self.nutrients, self.baseline)
+        self.loaded_at = datetime.utcnow()
+
+    def status(self):
+        return {
+            "foods": len(self.parser.df),
+            "nutrient_rows": len(self.nutrients),
+            "nutrient_columns": len(self.nutrient_columns),
+            "baseline_groups": len(self.baseline.groups),
+            "priced_items": len(self.prices),
+            "price_version": self.prices.version,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+    def caches(self):
+        """This catalog's caches; not in cache.CACHES, so a discarded catalog never shows up in metrics."""
+        return {cache.name: cache for cache in (self.parser.match_cache, self.prices.plan_cache)}
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def load_catalog():
+    """Build the catalog if it has not been built yet and return it."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = FoodCatalog()
+        return _catalog
+
+
+def reload_catalog():
+    """Rebuild the catalog from disk and swap it in. Requests already running keep the old one."""
+    global _catalog
+    catalog = FoodCatalog()
+    with _catalog_lock:
+        previous, _catalog = _catalog, catalog
+    if previous is not None:
+        # Cached matches and shopping plans point at rows of the old data
+        previous.parser.match_cache.clear()
+        previous.prices.plan_cache.clear()
+    return catalog
+
+
+def get_catalog():
+    """FastAPI dependency returning the shared catalog."""
+    return _catalog if _catalog is not None else load_catalog()
@@ -3,7 +3,8 @@ from fastapi import HTTPException, Response
 from fastapi.responses import JSONResponse
 from models.user import UserLogin
 from db import db
-from passlib.context import CryptContext
+from passwords import verify_password
+from controllers.user_controller import forget_session
 from jose import jwt
 import os
 from datetime import datetime, timedelta
@@ -11,10 +12,6 @@ from datetime import datetime, timedelta
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -25,13 +22,16 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 # Logout API
 async def logout_user(request: Request):
+    # Otherwise the token's claims and user stay cached until their TTL runs out
+    forget_session(request.cookies.get("access_token"))
     response = JSONResponse(content={"message": "Logged out successfully"})
     response.delete_cookie(key="access_token")
     return response
 
 async def login_user(login: UserLogin):
     user = await db["user"].find_one({"email": login.email})
-    if not user or not verify_password(login.password, user.get("password", "")):
+    # bcrypt runs on the password pool, not the event loop
+    if not user or not await verify_password(login.password, user.get("password", "")):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Create the access token
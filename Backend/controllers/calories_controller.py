@@ -1,56 +1,137 @@
-import json
+import numpy as np
 from fastapi import HTTPException
 from db import db
+from cache import LRUCache
+from daily_totals import get_daily_intakes, get_daily_totals
+
+ACTIVITY_FACTORS = {
+    "Sedentary": 1.2,
+    "Lightly active": 1.375,
+    "Moderately active": 1.55,
+    "Very active": 1.725,
+    "Extra active": 1.9
+}
+DEFAULT_LIFESTYLE = "Moderately active"
+# User fields the target depends on; changing any of them invalidates the cached target
+CALORIE_FIELDS = ("gender", "age", "height", "weight", "lifestyle")
+USER_PROJECTION = {"email": 1, **{field: 1 for field in CALORIE_FIELDS}}
+MAX_BATCH_SIZE = 5000
+
+# user_id -> daily calorie target
+calorie_targets = LRUCache("calorie_targets", maxsize=50000)
+
+
+def daily_calorie_targets(genders, ages, heights, weights, lifestyles):
+    """Mifflin-St Jeor BMR times activity factor for arrays of users.
+
+    Missing numbers give NaN targets instead of failing the whole batch.
+    """
+    def numbers(values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+    offset = np.where(np.asarray(genders) == "M", 5.0, -161.0)
+    bmr = 10 * numbers(weights) + 6.25 * numbers(heights) - 5 * numbers(ages) + offset
+    factors = np.array([ACTIVITY_FACTORS.get(l, ACTIVITY_FACTORS[DEFAULT_LIFESTYLE]) for l in lifestyles])
+    return np.round(bmr * factors, 2)
+
+
+def intake_statuses(intakes, targets):
+    intakes = np.asarray(intakes, dtype=np.float64)
+    return np.where(np.isnan(targets), "Unknown",
+                    np.where(intakes < targets, "Below requirement",
+                             np.where(intakes > targets, "Above requirement", "Meets requirement")))
+
+
+def user_calorie_targets(users):
+    """Targets for user documents, computed in one vectorized call for cache misses."""
+    targets = np.empty(len(users))
+    missing = []
+    for i, user in enumerate(users):
+        cached = calorie_targets.get(str(user["_id"]))
+        if cached is None:
+            missing.append(i)
+        else:
+            targets[i] = cached
+    if missing:
+        rows = [users[i] for i in missing]
+        computed = daily_calorie_targets(
+            [u.get("gender") for u in rows],
+            [u.get("age") for u in rows],
+            [u.get("height") for u in rows],
+            [u.get("weight") for u in rows],
+            [u.get("lifestyle", DEFAULT_LIFESTYLE) for u in rows],
+        )
+        for i, target in zip(missing, computed):
+            targets[i] = target
+            if not np.isnan(target):
+                calorie_targets.set(str(users[i]["_id"]), float(target))
+    return targets
+
+
+def invalidate_calorie_target(user_id, updated_fields=CALORIE_FIELDS):
+    if any(field in updated_fields for field in CALORIE_FIELDS):
+        calorie_targets.pop(str(user_id))
+
 
 async def analyze_calories(email: str):
     try:
         # Fetch user info from DB
-        user = await db["user"].find_one({"email": email})
+        user = await db["user"].find_one({"email": email}, USER_PROJECTION)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        # Extract user info
-        gender = user.get("gender")
-        age = user.get("age")
-        height = user.get("height")
-        weight = user.get("weight")
-        lifestyle = user.get("lifestyle", "Moderately active")
-
-        # Calculate BMR (Mifflin-St Jeor)
-        if gender == "M":
-            bmr = 10 * weight + 6.25 * height - 5 * age + 5
-        else:
-            bmr = 10 * weight + 6.25 * height - 5 * age - 161
-
-        activity_factors = {
-            "Sedentary": 1.2,
-            "Lightly active": 1.375,
-            "Moderately active": 1.55,
-            "Very active": 1.725,
-            "Extra active": 1.9
-        }
-        daily_calories = round(bmr * activity_factors.get(lifestyle, 1.55), 2)
-
-        # Get actual intake from output.json
-        try:
-            with open("output.json", "r", encoding="utf-8") as f:
-                output = json.load(f)
-            intake = output.get("Data.Kilocalories", 0)
-        except Exception:
-            intake = 0
-
-        # Compare and prepare result
-        if intake < daily_calories:
-            status = "Below requirement"
-        elif intake > daily_calories:
-            status = "Above requirement"
-        else:
-            status = "Meets requirement"
+
+        daily_calories = float(user_calorie_targets([user])[0])
+
+        # Get actual intake from today's running totals
+        totals = await get_daily_totals(str(user["_id"]), ["Data.Kilocalories"]) or {}
+        intake = totals.get("Data.Kilocalories", 0)
 
         return {
             "email": email,
-            "required_calories": daily_calories,
+            # NaN (incomplete profile) isn't valid JSON; reported as "Unknown" status like the bulk path
+            "required_calories": None if np.isnan(daily_calories) else daily_calories,
             "actual_intake": intake,
-            "status": status
+            "status": str(intake_statuses([intake], np.array([daily_calories]))[0])
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _calorie_batch(users):
+    targets = user_calorie_targets(users)
+    intakes_by_user = await get_daily_intakes([str(u["_id"]) for u in users], "Data.Kilocalories")
+    intakes = [intakes_by_user.get(str(u["_id"]), 0) for u in users]
+    statuses = intake_statuses(intakes, targets)
+    return [
+        {
+            "email": user.get("email"),
+            "required_calories": None if np.isnan(target) else float(target),
+            "actual_intake": intake,
+            "status": str(status),
+        }
+        for user, target, intake, status in zip(users, targets, intakes, statuses)
+    ]
+
+
+async def analyze_calories_all(batch_size: int = 1000):
+    """Daily targets and today's intake status for every user, one projected query."""
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+    try:
+        results = []
+        batch = []
+        async for user in db["user"].find({}, USER_PROJECTION).batch_size(batch_size):
+            batch.append(user)
+            if len(batch) >= batch_size:
+                results.extend(await _calorie_batch(batch))
+                batch = []
+        if batch:
+            results.extend(await _calorie_batch(batch))
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return {"users": len(results), "summary": summary, "results": results}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,19 @@
+import asyncio
+from fastapi import HTTPException
+from catalog import get_catalog, reload_catalog
+from parse_pool import parse_pool
+
+
+async def catalog_status():
+    return {**get_catalog().status(), "parse_pool": parse_pool.stats()}
+
+
+async def reload_catalog_route():
+    try:
+        # Loading the CSVs is blocking, keep it off the event loop
+        catalog = await asyncio.to_thread(reload_catalog)
+        # Process workers hold their own catalog copy
+        await asyncio.to_thread(parse_pool.restart)
+        return {"message": "Catalog reloaded", "catalog": catalog.status()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
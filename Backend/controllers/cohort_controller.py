@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+import numpy as np
+from fastapi import HTTPException
+
+from baseline import age_group
+from catalog import get_catalog
+from daily_totals import get_daily_totals_many
+from db import db
+
+MAX_BATCH_SIZE = 5000
+
+
+class CohortCounts:
+    """Running per-nutrient status counts; memory does not grow with the number of users."""
+
+    def __init__(self, names):
+        self.names = names
+        self.deficient = np.zeros(len(names), dtype=np.int64)
+        self.normal = np.zeros(len(names), dtype=np.int64)
+        self.over = np.zeros(len(names), dtype=np.int64)
+        self.users = 0
+        self.analyzed = 0
+        self.without_data = 0
+        self.unknown_group = 0
+        self.groups = defaultdict(int)
+
+    def add(self, status, present):
+        # status: (users, nutrients) matrix of -1/0/1; nutrients missing from the group's baseline don't count
+        self.deficient += ((status == -1) & present).sum(axis=0)
+        self.normal += ((status == 0) & present).sum(axis=0)
+        self.over += ((status == 1) & present).sum(axis=0)
+
+    def report(self):
+        nutrients = {}
+        for i, name in enumerate(self.names):
+            evaluated = int(self.deficient[i] + self.normal[i] + self.over[i])
+            nutrients[name] = {
+                "deficient": int(self.deficient[i]),
+                "normal": int(self.normal[i]),
+                "over": int(self.over[i]),
+                "deficiency_rate": round(self.deficient[i] / evaluated, 4) if evaluated else 0.0,
+            }
+        return {
+            "users": self.users,
+            "analyzed": self.analyzed,
+            "without_data": self.without_data,
+            "unknown_group": self.unknown_group,
+            "groups": dict(self.groups),
+            "nutrients": nutrients,
+        }
+
+
+async def _analyze_batch(users, baseline, counts, day=None):
+    # The day's running totals for the whole batch in one query, as /analyze/nutrients uses them
+    daily = await get_daily_totals_many([str(user["_id"]) for user in users], baseline.keys, day)
+    # Group by (gender, age group) so each baseline vector is used for a whole block of users
+    grouped = defaultdict(list)
+    for user in users:
+        totals = daily.get(str(user["_id"]))
+        if totals is None:
+            counts.without_data += 1
+            continue
+        age = user.get("age")
+        key = (user.get("gender"), age_group(age) if age is not None else None)
+        if key not in baseline.groups:
+            counts.unknown_group += 1
+            continue
+        grouped[key].append(baseline.values_from_totals(totals))
+
+    for key, rows in grouped.items():
+        base, ul, present = baseline.groups[key]
+        counts.add(baseline.status_vector(np.vstack(rows), base, ul), present)
+        counts.groups[f"{key[0]}/{key[1]}"] += len(rows)
+        counts.analyzed += len(rows)
+
+
+async def analyze_cohort(batch_size: int = 500, day: str = None):
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+    try:
+        baseline = get_catalog().baseline
+        counts = CohortCounts(baseline.names)
+        # Only the fields the analysis needs, streamed in batches
+        cursor = db["user"].find({}, {"gender": 1, "age": 1}).batch_size(batch_size)
+        batch = []
+        async for user in cursor:
+            counts.users += 1
+            batch.append(user)
+            if len(batch) >= batch_size:
+                await _analyze_batch(batch, baseline, counts, day)
+                batch = []
+        if batch:
+            await _analyze_batch(batch, baseline, counts, day)
+        return counts.report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
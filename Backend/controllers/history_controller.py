@@ -0,0 +1,24 @@
+from fastapi import HTTPException
+from db import db
+from nutrition_history import ROLLUP_PERIODS, rollup
+
+
+async def nutrition_history(email: str, period: str = "day", days: int = 30):
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of {', '.join(ROLLUP_PERIODS)}")
+    if not 1 <= days <= 366:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 366")
+    try:
+        user = await db["user"].find_one({"email": email}, {"_id": 1})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return {
+            "email": email,
+            "period": period,
+            "days": days,
+            "rollups": await rollup(str(user["_id"]), period, days),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
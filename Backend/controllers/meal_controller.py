@@ -0,0 +1,24 @@
+from bson import ObjectId
+from fastapi import HTTPException
+from catalog import get_catalog
+from datetime import datetime
+from daily_totals import day_key, delete_meal, get_daily_totals
+from pipeline_state import resolve_user_id
+
+
+async def get_daily_totals_route(email: str, day: str = None):
+    user_id = await resolve_user_id(email)
+    day = day or day_key(datetime.utcnow())
+    totals = await get_daily_totals(user_id, get_catalog().nutrient_columns, day)
+    if totals is None:
+        raise HTTPException(status_code=404, detail="No meals logged for this day")
+    return {"email": email, "day": day, "totals": totals}
+
+
+async def delete_meal_route(email: str, meal_id: str):
+    if not ObjectId.is_valid(meal_id):
+        raise HTTPException(status_code=400, detail="Invalid meal id")
+    user_id = await resolve_user_id(email)
+    if not await delete_meal(user_id, meal_id):
+        raise HTTPException(status_code=404, detail="Meal not found")
+    return {"message": "Meal deleted", "meal_id": meal_id}
@@ -0,0 +1,23 @@
+from cache import CACHES
+from catalog import get_catalog
+from controllers.user_controller import auth_cache_stats
+from db import DB_MONITORING, client_settings
+from db_metrics import command_metrics, pool_metrics
+
+
+async def cache_metrics():
+    caches = {**CACHES, **get_catalog().caches()}
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+async def auth_metrics():
+    return auth_cache_stats()
+
+
+async def db_metrics():
+    return {
+        "monitoring": DB_MONITORING,
+        "client_settings": client_settings,
+        "pools": pool_metrics.stats(),
+        "commands": command_metrics.stats(),
+    }
@@ -1,57 +1,69 @@
-from fastapi import HTTPException, APIRouter
+from fastapi import HTTPException, APIRouter, Depends
 from pydantic import BaseModel
-import json
-from parser import NutritionParser
+from typing import List
+from datetime import datetime
+from parse_pool import ParsePool, ParsePoolFull, get_parse_pool, parse_and_total, parse_and_total_many
+from pipeline_state import resolve_user_id
+from nutrition_history import record_meal
+from daily_totals import add_meal
 
 router = APIRouter()
 
 class ParseRequest(BaseModel):
     input: str
+    # Whose meal this is; the result feeds that user's daily totals and history
+    email: str
 
 class ParseResponse(BaseModel):
     output: dict
+    # Id of the stored meal, for deleting it later
+    meal_id: str
+
+class ParseBatchRequest(BaseModel):
+    inputs: List[str]
+
+class ParseBatchResponse(BaseModel):
+    outputs: List[dict]
+
+MAX_BATCH_SIZE = 5000
+
+def pool_full_error():
+    return HTTPException(status_code=503, detail="Parser is busy, try again shortly", headers={"Retry-After": "1"})
 
 @router.post("/parse-input", response_model=ParseResponse)
-async def parse_input_route(body: ParseRequest):
+async def parse_input_route(body: ParseRequest, pool: ParsePool = Depends(get_parse_pool)):
     try:
         user_input = body.input
         if not user_input:
             raise HTTPException(status_code=400, detail="No input provided")
-        parser = NutritionParser('food_selected.csv')
-        log_data = parser.parse_input(user_input)
-        with open("parser.json", "w", encoding="utf-8") as f:
-            json.dump(log_data, f, indent=2)
-        # --- Create output.json from parser log ---
-        import pandas as pd
-        FOOD_CSV_PATH = "food.csv"
-        OUTPUT_JSON_PATH = "output.json"
-        try:
-            df = pd.read_csv(FOOD_CSV_PATH)
-            results = []
-            for key, entry in log_data.items():
-                row = df[df[df.columns[2]] == int(key)]
-                if row.empty:
-                    continue
-                row = row.iloc[0]
-                amount_gm = entry["amount_gm"]
-                nutrition = {}
-                for col in df.columns[3:]:
-                    try:
-                        value = float(row[col]) * (amount_gm / 100)
-                    except (ValueError, TypeError):
-                        value = 0
-                    nutrition[col] = value
-                results.append(nutrition)
-            total_nutrition = {}
-            for col in df.columns[3:]:
-                total_nutrition[col] = sum(item[col] for item in results)
-            with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
-                json.dump(total_nutrition, f, indent=2)
-        except Exception:
-            pass
-        # Return output.json content as response
-        with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
-            output_data = json.load(f)
-        return ParseResponse(output=output_data)
+        user_id = await resolve_user_id(body.email)
+        # Parsing and totals run in the worker pool so the event loop stays free
+        log_data, total_nutrition = await pool.run(parse_and_total, user_input)
+        # Add the meal to today's running totals and keep it, linked by meal_id, for the history rollups
+        timestamp = datetime.utcnow()
+        meal_id = await add_meal(user_id, log_data, total_nutrition, timestamp)
+        await record_meal(user_id, total_nutrition, meal_id, timestamp)
+        return ParseResponse(output=total_nutrition, meal_id=meal_id)
+    except HTTPException:
+        raise
+    except ParsePoolFull:
+        raise pool_full_error()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/parse-input/batch", response_model=ParseBatchResponse)
+async def parse_input_batch_route(body: ParseBatchRequest, pool: ParsePool = Depends(get_parse_pool)):
+    try:
+        if not body.inputs:
+            raise HTTPException(status_code=400, detail="No input provided")
+        if len(body.inputs) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} inputs per batch")
+        # One matrix product for every log in the batch; no shared files are touched
+        outputs = await pool.run(parse_and_total_many, body.inputs)
+        return ParseBatchResponse(outputs=outputs)
+    except HTTPException:
+        raise
+    except ParsePoolFull:
+        raise pool_full_error()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,50 +1,69 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import csv
-import json
+from typing import Literal
+from db import db
+from pipeline_state import pipeline_state, resolve_user_id
+from catalog import get_catalog
+from daily_totals import get_daily_totals
 
 router = APIRouter()
 
 class ShoppingListRequest(BaseModel):
     budget: float
+    # Whose nutrient analysis to shop for
+    email: str
+    # "cover": which foods to buy; "quantity": how much of each
+    mode: Literal["cover", "quantity"] = "cover"
+
+async def generate_quantity_plan(body: ShoppingListRequest):
+    """Grams of each food closing today's gaps to baseline at minimum cost."""
+    user = await db["user"].find_one({"email": body.email}, {"age": 1, "gender": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    catalog = get_catalog()
+    # Nothing logged yet today means the whole baseline is still open
+    totals = await get_daily_totals(str(user["_id"]), catalog.nutrient_columns) or {}
+    gaps = catalog.baseline.gaps(user.get("gender"), user.get("age"), totals)
+    if gaps is None:
+        raise HTTPException(status_code=404, detail="No baseline for this user")
+
+    gap, room = gaps
+    plan = catalog.prices.quantity_plan(gap, room, body.budget)
+    return {
+        "shopping_list": [
+            {
+                "name": item["name"],
+                "price": item["price"],
+                "quantity_g": item["quantity_g"],
+                "cost": item["cost"],
+                "nutrients": item["nutrients"]
+            }
+            for item in plan["items"]
+        ],
+        "total_cost": plan["total_cost"],
+        "budget": body.budget,
+        "shortfall": plan["shortfall"],
+        "mode": body.mode
+    }
 
 @router.post("/generate-shopping-list")
 async def generate_shopping_list(body: ShoppingListRequest):
     try:
-        # Load nutrient deficiencies
-        with open("nutrition_analysis.json", "r", encoding="utf-8") as f:
-            analysis = json.load(f)
-        deficient_nutrients = [nutrient for nutrient, status in analysis.items() if status == -1]
+        if body.mode == "quantity":
+            return await generate_quantity_plan(body)
 
-        # Load nutrient_with_prices.csv
-        food_items = []
-        with open("nutrient_with_prices.csv", "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            next(reader)  # skip header
-            for row in reader:
-                if len(row) < 4:
-                    continue
-                food_id = row[0]
-                food_name = row[1]
-                nutrients = [n.strip() for n in row[2:-1]]
-                price = int(row[-1])
-                food_items.append({
-                    "id": food_id,
-                    "name": food_name,
-                    "nutrients": nutrients,
-                    "price": price
-                })
+        # Load this user's nutrient deficiencies (stored by analyze_log)
+        user_id = await resolve_user_id(body.email)
+        analysis = (await pipeline_state.get(user_id)).get("analysis")
+        if analysis is None:
+            raise HTTPException(status_code=404, detail="No nutrient analysis for this user")
+        deficient_nutrients = [nutrient for nutrient, status in analysis.items() if status == -1]
 
-        # Select foods for deficient nutrients within budget
-        selected = []
-        budget_left = body.budget
-        for nutrient in deficient_nutrients:
-            candidates = [item for item in food_items if nutrient in item["nutrients"] and item["price"] <= budget_left]
-            if candidates:
-                best = min(candidates, key=lambda x: x["price"])
-                if best["name"] not in [f["name"] for f in selected]:
-                    selected.append(best)
-                    budget_left -= best["price"]
+        # Best weighted coverage of the deficiencies within budget (priority nutrients count double),
+        # over the price catalog compiled at startup; repeated deficiency sets and budgets hit the plan cache
+        selected, plan = get_catalog().prices.select_cached(deficient_nutrients, body.budget)
+        covered = {n for item in selected for n in item["nutrients"]}
 
         total_cost = sum(item['price'] for item in selected)
         shopping_list = [
@@ -58,7 +77,12 @@ async def generate_shopping_list(body: ShoppingListRequest):
         return {
             "shopping_list": shopping_list,
             "total_cost": total_cost,
-            "budget": body.budget
+            "budget": body.budget,
+            "covered_nutrients": [n for n in deficient_nutrients if n in covered],
+            "uncovered_nutrients": [n for n in deficient_nutrients if n not in covered],
+            "optimal": plan["optimal"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,27 +1,74 @@
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from jose import jwt, JWTError
+from typing import Literal, Optional
+import base64
+import json
 import os
+import time
 from models.user import User, UserCreate
 from db import db
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from controllers.calories_controller import invalidate_calorie_target
+from passwords import hash_password
+from cache import LRUCache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret")
 ALGORITHM = "HS256"
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+USERS_PAGE_SIZE = 100
+MAX_USERS_PAGE_SIZE = 1000
+
+# Verified token -> claims, and user_id -> user document, so an authenticated
+# request skips the signature check and the user round trip within the TTL
+auth_tokens = LRUCache("auth_tokens", maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+auth_users = LRUCache("auth_users", maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+def decode_token(token):
+    claims = auth_tokens.get(token)
+    # A cached token must still be unexpired
+    if claims is None or claims.get("exp", 0) <= time.time():
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        auth_tokens.set(token, claims)
+    return claims
+
+def forget_session(token=None, user_id=None):
+    """Drop cached auth state after logout or a user change."""
+    if token:
+        claims = auth_tokens.pop(token)
+        user_id = user_id or (claims or {}).get("user_id")
+    if user_id:
+        auth_users.pop(str(user_id))
+
+def auth_cache_stats():
+    return {
+        "tokens": auth_tokens.stats(),
+        "users": auth_users.stats(),
+        # Every user-cache hit is a find_one that did not happen
+        "db_calls_saved": auth_users.hits,
+        "db_calls": auth_users.misses,
+    }
 
 async def get_current_user(request: Request):
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id = payload.get("user_id")
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
-        user = await db["user"].find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        user["_id"] = str(user["_id"])
-        return user
+        user = auth_users.get(user_id)
+        if user is None:
+            user = await db["user"].find_one({"_id": ObjectId(user_id)})
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            user["_id"] = str(user["_id"])
+            auth_users.set(user_id, user)
+        # Callers get their own copy of the cached document
+        return dict(user)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -32,6 +79,8 @@ async def update_user_info(updated: dict, current_user: dict = Depends(get_curre
     updated.pop("password", None)
     result = await db["user"].update_one({"_id": ObjectId(user_id)}, {"$set": updated})
     if result.modified_count:
+        invalidate_calorie_target(user_id, updated)
+        forget_session(user_id=user_id)
         user = await db["user"].find_one({"_id": ObjectId(user_id)})
         user["_id"] = str(user["_id"])
         return user
@@ -39,32 +88,63 @@ async def update_user_info(updated: dict, current_user: dict = Depends(get_curre
         raise HTTPException(status_code=400, detail="No changes made")
 from fastapi import HTTPException
 
-async def get_all_users():
-    users_cursor = db["user"].find()
+def encode_cursor(user_id):
+    return base64.urlsafe_b64encode(ObjectId(user_id).binary).decode().rstrip("=")
+
+def decode_cursor(token):
+    try:
+        return ObjectId(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def user_projection(fields=None):
+    """Mongo projection for a comma-separated field list; the password hash is never returned."""
+    if not fields:
+        return {"password": 0}
+    projection = {field.strip(): 1 for field in fields.split(",") if field.strip() and field.strip() != "password"}
+    return projection or {"password": 0}
+
+async def get_all_users(limit: int = Query(USERS_PAGE_SIZE, ge=1, le=MAX_USERS_PAGE_SIZE),
+                        cursor: Optional[str] = None, fields: Optional[str] = None,
+                        format: Literal["json", "ndjson"] = "json"):
+    # Keyset pagination: resume after the last _id seen instead of skipping
+    query = {"_id": {"$gt": decode_cursor(cursor)}} if cursor else {}
+    projection = user_projection(fields)
+
+    if format == "ndjson":
+        # Everything after the cursor, one document per line, as the cursor yields batches
+        async def stream():
+            async for user in db["user"].find(query, projection).sort("_id", 1).batch_size(USERS_PAGE_SIZE):
+                user["_id"] = str(user["_id"])
+                yield json.dumps(user, default=str) + "\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    # One extra document tells whether another page follows
     users = []
-    async for user in users_cursor:
+    async for user in db["user"].find(query, projection).sort("_id", 1).limit(limit + 1):
         user["_id"] = str(user["_id"])
         users.append(user)
-    return users
+    next_cursor = encode_cursor(users[limit - 1]["_id"]) if len(users) > limit else None
+    return {"users": users[:limit], "next_cursor": next_cursor}
 
 async def create_user(user: UserCreate):
-    # Check for unique email
-    existing = await db["user"].find_one({"email": user.email})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already exists")
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     user_dict = user.dict(exclude_unset=True)
-    user_dict["password"] = pwd_context.hash(user_dict["password"])
+    user_dict["password"] = await hash_password(user_dict["password"])
     print("Using database:", db.name)
     print("Inserting into collection: user")
-    result = await db["user"].insert_one(user_dict)
+    try:
+        result = await db["user"].insert_one(user_dict)
+    except DuplicateKeyError:
+        # The unique email index rejects duplicates atomically (no check-then-insert race)
+        raise HTTPException(status_code=400, detail="Email already exists")
     print(f"Inserted user with _id: {result.inserted_id}")
     user_dict["_id"] = str(result.inserted_id)
     return User(**user_dict)
 
 async def delete_all_users():
     result = await db["user"].delete_many({})
+    # Deleted users must not keep authenticating from the cache
+    auth_users.clear()
     return {"deleted_count": result.deleted_count}
 
 async def get_user(email: str):
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from db import db
+from nutrition_history import delete_meal_record
+
+MEALS_COLLECTION = "meals"
+DAILY_TOTALS_COLLECTION = "daily_totals"
+
+
+def encode_key(key):
+    # MongoDB update paths treat "." as nesting, so Data.* columns are stored with "_"
+    return key.replace(".", "_")
+
+
+def day_key(timestamp):
+    return timestamp.strftime("%Y-%m-%d")
+
+
+def daily_totals_id(user_id, day):
+    return f"{user_id}:{day}"
+
+
+def _inc(totals, sign):
+    return {f"nutrients.{encode_key(key)}": sign * value for key, value in totals.items()}
+
+
+async def add_meal(user_id, log_data, totals, timestamp=None):
+    """Store a parsed meal and add its totals to the user's running total for that day."""
+    timestamp = timestamp or datetime.utcnow()
+    day = day_key(timestamp)
+    meal = {
+        "user_id": user_id,
+        "day": day,
+        "timestamp": timestamp,
+        "log": log_data,
+        "nutrients": {encode_key(key): value for key, value in totals.items()},
+    }
+    result = await db[MEALS_COLLECTION].insert_one(meal)
+    await db[DAILY_TOTALS_COLLECTION].update_one(
+        {"_id": daily_totals_id(user_id, day)},
+        {"$inc": {**_inc(totals, 1), "meals": 1}, "$setOnInsert": {"user_id": user_id, "day": day}},
+        upsert=True,
+    )
+    return str(result.inserted_id)
+
+
+async def delete_meal(user_id, meal_id):
+    """Remove a meal, subtract it from that day's running total and drop its history record.
+
+    Returns False if not found.
+    """
+    meal = await db[MEALS_COLLECTION].find_one_and_delete({"_id": ObjectId(meal_id), "user_id": user_id})
+    if not meal:
+        return False
+    await db[DAILY_TOTALS_COLLECTION].update_one(
+        {"_id": daily_totals_id(user_id, meal["day"])},
+        {"$inc": {**{f"nutrients.{key}": -value for key, value in meal["nutrients"].items()}, "meals": -1}},
+    )
+    await delete_meal_record(user_id, meal_id)
+    return True
+
+
+async def get_daily_totals(user_id, columns, day=None):
+    """The user's running Data.* totals for a day (today by default), or None if nothing was logged."""
+    doc = await db[DAILY_TOTALS_COLLECTION].find_one({"_id": daily_totals_id(user_id, day or day_key(datetime.utcnow()))})
+    return _totals(doc, columns)
+
+
+async def get_daily_totals_many(user_ids, columns, day=None):
+    """Running Data.* totals for many users on a day in a single query; users with nothing logged are left out."""
+    day = day or day_key(datetime.utcnow())
+    ids = [daily_totals_id(user_id, day) for user_id in user_ids]
+    projection = {"user_id": 1, "meals": 1, **{f"nutrients.{encode_key(key)}": 1 for key in columns}}
+    totals = {}
+    async for doc in db[DAILY_TOTALS_COLLECTION].find({"_id": {"$in": ids}}, projection):
+        day_totals = _totals(doc, columns)
+        if day_totals is not None:
+            totals[doc["user_id"]] = day_totals
+    return totals
+
+
+def _totals(doc, columns):
+    if not doc or doc.get("meals", 0) <= 0:
+        return None
+    nutrients = doc.get("nutrients", {})
+    # Clamp float residue left behind by deletions
+    return {key: max(nutrients.get(encode_key(key), 0.0), 0.0) for key in columns}
+
+
+async def get_daily_intakes(user_ids, key, day=None):
+    """One nutrient's running total for many users on a day, in a single query."""
+    day = day or day_key(datetime.utcnow())
+    field = f"nutrients.{encode_key(key)}"
+    ids = [daily_totals_id(user_id, day) for user_id in user_ids]
+    intakes = {}
+    async for doc in db[DAILY_TOTALS_COLLECTION].find({"_id": {"$in": ids}}, {"user_id": 1, "meals": 1, field: 1}):
+        if doc.get("meals", 0) > 0:
+            intakes[doc["user_id"]] = max(doc.get("nutrients", {}).get(encode_key(key), 0.0), 0.0)
+    return intakes
@@ -2,7 +2,41 @@ import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
+from db_metrics import command_metrics, pool_metrics
+
 load_dotenv()
 mongodb_uri = os.getenv("MONGODB_URI")
-client = AsyncIOMotorClient(mongodb_uri)
-db = client["NutriSync"]
\ No newline at end of file
+
+# Environment variable -> MongoClient option; unset ones keep the driver default
+POOL_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_CONNECTING": ("maxConnecting", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    "MONGO_READ_PREFERENCE": ("readPreference", str),
+}
+# Command and pool listeners behind /metrics/db
+DB_MONITORING = os.getenv("DB_MONITORING", "true").lower() in ("1", "true", "yes")
+
+
+def client_options():
+    options = {}
+    for env, (option, cast) in POOL_OPTIONS.items():
+        value = os.getenv(env)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+client_settings = client_options()
+client = AsyncIOMotorClient(
+    mongodb_uri,
+    event_listeners=[command_metrics, pool_metrics] if DB_MONITORING else [],
+    **client_settings,
+)
+db = client["NutriSync"]
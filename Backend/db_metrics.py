@@ -0,0 +1,157 @@
+import threading
+from collections import defaultdict
+
+from pymongo import monitoring
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds. Not locked; its owner locks."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        i = 0
+        while i < len(self.bounds) and ms > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (max for the open bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.5),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets": {**{f"le_{b}": n for b, n in zip(self.bounds, self.counts)}, "inf": self.counts[-1]},
+        }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Server round-trip latency per collection and command, from pymongo command monitoring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (connection_id, request_id) -> "collection.command", between started and finished
+        self._pending = {}
+        self.latency = defaultdict(LatencyHistogram)
+        self.failures = defaultdict(int)
+
+    def started(self, event):
+        # getMore carries a cursor id under its name; the collection is in "collection"
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        target = event.command.get(key)
+        collection = target if isinstance(target, str) else "-"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = f"{collection}.{event.command_name}"
+
+    def _finish(self, event):
+        with self._lock:
+            key = self._pending.pop((event.connection_id, event.request_id), f"-.{event.command_name}")
+            self.latency[key].observe(event.duration_micros / 1000)
+        return key
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        key = self._finish(event)
+        with self._lock:
+            self.failures[key] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {**histogram.stats(), "failures": self.failures.get(key, 0)}
+                for key, histogram in sorted(self.latency.items())
+            }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection checkout wait and open/in-use connection counts per server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_wait = defaultdict(LatencyHistogram)
+        self.counts = defaultdict(lambda: {"open": 0, "in_use": 0, "checkout_failures": 0, "cleared": 0})
+
+    def _server(self, event):
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_created(self, event):
+        with self._lock:
+            self.counts[self._server(event)]["open"] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.counts[self._server(event)]["open"] -= 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._server(event)
+            self.counts[server]["in_use"] += 1
+            self.checkout_wait[server].observe(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.counts[self._server(event)]["in_use"] -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event)
+            self.counts[server]["checkout_failures"] += 1
+            self.checkout_wait[server].observe(event.duration * 1000)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.counts[self._server(event)]["cleared"] += 1
+
+    # Events with nothing to record
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                server: {**counts, "checkout_wait": self.checkout_wait[server].stats()}
+                for server, counts in self.counts.items()
+            }
+
+
+command_metrics = CommandMetrics()
+pool_metrics = PoolMetrics()
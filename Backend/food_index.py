@@ -0,0 +1,107 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+WORD_RE = re.compile(r'\w+')
+
+
+class TokenIndex:
+    """Inverted index answering "which descriptions contain this token as a substring".
+
+    Descriptions are split into \\w+ words. A token made only of word characters is a
+    substring of a description exactly when it is a substring of one of its words, so
+    every substring of every vocabulary word maps to the rows holding that word.
+    """
+
+    def __init__(self, descriptions):
+        # Lowercased descriptions in row order (row id == position in the DataFrame)
+        self.descriptions = [str(d).lower() for d in descriptions]
+        word_rows = defaultdict(set)
+        for row_id, description in enumerate(self.descriptions):
+            for word in WORD_RE.findall(description):
+                word_rows[word].add(row_id)
+
+        # substring -> words containing it
+        substring_words = defaultdict(set)
+        for word in word_rows:
+            for start in range(len(word)):
+                for end in range(start + 1, len(word) + 1):
+                    substring_words[word[start:end]].add(word)
+
+        self.word_rows = {word: frozenset(rows) for word, rows in word_rows.items()}
+        self.substring_words = {sub: tuple(words) for sub, words in substring_words.items()}
+        self._postings = {}
+
+    def rows_containing(self, token):
+        """Row ids whose description contains `token` (same as `token in description`)."""
+        if not WORD_RE.fullmatch(token):
+            # Tokens with punctuation can span word boundaries, check them directly
+            return frozenset(i for i, d in enumerate(self.descriptions) if token in d)
+        words = self.substring_words.get(token)
+        if not words:
+            return frozenset()
+        # Only vocabulary substrings are memoized, so this stays bounded
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = frozenset().union(*(self.word_rows[word] for word in words))
+            self._postings[token] = postings
+        return postings
+
+    def best_match(self, tokens):
+        """Return (row_id, score) of the first row with the highest token score.
+
+        The score is the fraction of tokens found in the description, as in the
+        original full-table scan; rows scoring 0 are never returned.
+        """
+        counts = defaultdict(int)
+        for token in tokens:
+            for row_id in self.rows_containing(token):
+                counts[row_id] += 1
+        if not counts:
+            return None, 0
+        # Highest count wins, ties go to the earliest row like the sequential scan did
+        best_row = min(counts, key=lambda row_id: (-counts[row_id], row_id))
+        return best_row, counts[best_row] / len(tokens)
+
+
+def trigrams(text):
+    """Set of character trigrams of the padded, whitespace-normalized text."""
+    text = ' ' + ' '.join(WORD_RE.findall(str(text).lower())) + ' '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Character trigram index for fuzzy lookups, scored with the Dice coefficient."""
+
+    def __init__(self, descriptions, cutoff=0.3):
+        self.cutoff = cutoff
+        postings = defaultdict(list)
+        sizes = []
+        for row_id, description in enumerate(descriptions):
+            grams = trigrams(description) if description else set()
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(row_id)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self.sizes = np.array(sizes, dtype=np.float64)
+
+    def search(self, text, k=1, cutoff=None):
+        """Return up to k (row_id, score) pairs, best first, with score >= cutoff."""
+        cutoff = self.cutoff if cutoff is None else cutoff
+        query = trigrams(text)
+        hits = [self.postings[gram] for gram in query if gram in self.postings]
+        if not hits:
+            return []
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.sizes))
+        scores = 2.0 * overlap / (len(query) + self.sizes)
+        candidates = np.flatnonzero(scores >= cutoff)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            # Keep every row tied with the k-th score so the tie-break below sees them all
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth]
+        # Best score first, earliest row on ties
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))[:k]]
+        return [(int(row_id), float(scores[row_id])) for row_id in candidates]
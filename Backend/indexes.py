@@ -0,0 +1,99 @@
+"""MongoDB indexes the app relies on, applied at startup.
+
+Also runnable from the Backend directory:
+
+    python -m indexes            # create missing indexes
+    python -m indexes --check    # explain the hot queries, exit 1 on a collection scan
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from db import db
+from nutrition_history import NUTRITION_COLLECTION
+
+# Explain the hot queries at startup and print any that scan a whole collection
+INDEX_CHECK = os.getenv("INDEX_CHECK", "false").lower() in ("1", "true", "yes")
+
+# collection -> indexes; _id is always indexed
+INDEXES = {
+    "user": [
+        # Login, signup and every lookup by email; also the duplicate-email guard
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "food": [
+        IndexModel([("Nutrient Data Bank Number", ASCENDING)], name="ndb"),
+    ],
+    NUTRITION_COLLECTION: [
+        IndexModel([("user_id", ASCENDING), ("timestamp", ASCENDING)], name="user_timestamp"),
+    ],
+}
+
+# name -> (collection, filter) shaped like the queries the endpoints run
+HOT_QUERIES = {
+    "user by email": ("user", {"email": "probe@example.com"}),
+    "user by id": ("user", {"_id": ObjectId()}),
+    "food by NDB number": ("food", {"Nutrient Data Bank Number": "0"}),
+    "nutrition history": (NUTRITION_COLLECTION, {"user_id": "probe", "timestamp": {"$gte": datetime(2000, 1, 1)}}),
+    "daily totals": ("daily_totals", {"_id": "probe:2000-01-01"}),
+}
+
+
+async def apply_indexes(registry=INDEXES):
+    """Create every registered index; an index that fails (e.g. duplicates) is reported, not raised."""
+    report = {}
+    for collection, indexes in registry.items():
+        try:
+            report[collection] = await db[collection].create_indexes(indexes)
+        except PyMongoError as e:
+            report[collection] = f"failed: {e}"
+    return report
+
+
+def _plan_stages(plan):
+    """Every "stage" name anywhere in an explain document."""
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+async def check_queries(queries=HOT_QUERIES):
+    """Explain each hot query; a query whose plan contains COLLSCAN is flagged as unindexed."""
+    results = {}
+    for name, (collection, query) in queries.items():
+        explain = await db.command({"explain": {"find": collection, "filter": query}, "verbosity": "queryPlanner"})
+        stages = _plan_stages(explain.get("queryPlanner", explain))
+        results[name] = {"collection": collection, "stages": stages, "indexed": "COLLSCAN" not in stages}
+    return results
+
+
+async def main():
+    arg_parser = argparse.ArgumentParser(description="Create or check the app's MongoDB indexes")
+    arg_parser.add_argument("--check", action="store_true", help="explain hot queries instead of creating indexes")
+    args = arg_parser.parse_args()
+
+    if not args.check:
+        for collection, result in (await apply_indexes()).items():
+            print(f"{collection}: {result}")
+        return 0
+    unindexed = 0
+    for name, result in (await check_queries()).items():
+        unindexed += not result["indexed"]
+        print(f"{'ok  ' if result['indexed'] else 'SCAN'} {name} ({result['collection']}): {' > '.join(result['stages'])}")
+    return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
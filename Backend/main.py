@@ -1,13 +1,47 @@
 from fastapi import FastAPI
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
 from routes.user_routes import router as user_router
 from db import db
+from catalog import load_catalog
+from parse_pool import parse_pool
+import passwords
+from nutrition_history import ensure_nutrition_collection
+from indexes import INDEX_CHECK, apply_indexes, check_queries
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the food catalog once so requests never parse the CSVs,
+    # then warm the parse workers (each process worker loads its own copy)
+    await asyncio.to_thread(load_catalog)
+    await asyncio.to_thread(parse_pool.start)
+    passwords.start()
+    try:
+        await ensure_nutrition_collection()
+    except Exception as e:
+        print(f"Could not prepare the nutrition history collection: {e}")
+    # After the time-series collection exists, so its index isn't created on a plain collection
+    try:
+        for collection, result in (await apply_indexes()).items():
+            if isinstance(result, str):
+                print(f"Index setup for {collection} {result}")
+        if INDEX_CHECK:
+            for name, result in (await check_queries()).items():
+                if not result["indexed"]:
+                    print(f"Unindexed query: {name} scans {result['collection']}")
+    except Exception as e:
+        print(f"Could not apply indexes: {e}")
+    yield
+    parse_pool.shutdown()
+    passwords.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
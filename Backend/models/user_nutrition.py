@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, root_validator
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 # List of allowed nutrients from nutrition_analysis.json
@@ -14,6 +14,7 @@ class UserNutrition(BaseModel):
     user_id: str = Field(..., description="User's unique identifier")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Timestamp of nutrition record")
     nutrients: Dict[str, Any] = Field(..., description="Nutrient values from nutrition_analysis.json")
+    meal_id: Optional[str] = Field(None, description="Id of the meal in the meals collection this record mirrors")
 
     @root_validator(pre=True)
     def filter_nutrients(cls, values):
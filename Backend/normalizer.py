@@ -0,0 +1,63 @@
+import re
+
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.]')
+STANDALONE_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+class TextNormalizer:
+    """Precompiled text normalization used by NutritionParser.
+
+    The transliteration table becomes one alternation regex and the quantity
+    patterns become one combined regex, so each item is scanned once for each.
+    """
+
+    def __init__(self, word_mapping, quantity_patterns):
+        self.word_mapping = dict(word_mapping)
+        # Longest words first so the alternation never prefers a shorter spelling
+        words = sorted(self.word_mapping, key=len, reverse=True)
+        self.word_re = re.compile(r'\b(?:' + '|'.join(re.escape(w) for w in words) + r')\b')
+
+        # Wrap each quantity pattern in its own group. The outer group number
+        # doubles as the pattern's priority; remember where its amount group lands.
+        parts = []
+        self.quantity_groups = {}
+        group = 1
+        for pattern, (unit, _) in quantity_patterns.items():
+            inner_groups = re.compile(pattern).groups
+            parts.append('(' + pattern + ')')
+            self.quantity_groups[group] = (group + 1 if inner_groups else None, unit)
+            group += 1 + inner_groups
+        self.quantity_re = re.compile('|'.join(parts), re.IGNORECASE)
+
+    def normalize(self, text):
+        """Lowercase, transliterate Bangla food words and drop special characters."""
+        text = self.word_re.sub(lambda m: self.word_mapping[m.group(0)], text.lower())
+        return SPECIAL_CHARS_RE.sub(' ', text)
+
+    def split_quantity(self, phrase):
+        """Return (quantity_info, description) for a normalized phrase in one scan.
+
+        The quantity comes from the first pattern (in table order) that matches,
+        and every quantity match is removed from the description.
+        """
+        best = None
+        pieces = []
+        last = 0
+        for match in self.quantity_re.finditer(phrase):
+            pieces.append(phrase[last:match.start()])
+            last = match.end()
+            # lastindex is the outer group, nested groups close before it
+            if best is None or match.lastindex < best.lastindex:
+                best = match
+        pieces.append(phrase[last:])
+
+        quantity_info = {'amount': 1.0, 'unit': 'serving'}
+        if best is not None:
+            amount_group, unit = self.quantity_groups[best.lastindex]
+            if unit != 'some':
+                amount = best.group(amount_group) if amount_group else None
+                quantity_info = {'amount': float(amount) if amount else 1.0, 'unit': unit}
+
+        # Remove any standalone numbers that weren't caught by quantity patterns
+        description = STANDALONE_NUMBER_RE.sub('', ''.join(pieces))
+        return quantity_info, ' '.join(description.split())
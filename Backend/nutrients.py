@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+NDB_COLUMN = "Nutrient Data Bank Number"
+
+
+class NutrientMatrix:
+    """food.csv nutrient columns as a dense float matrix (per 100 g) indexed by NDB number."""
+
+    def __init__(self, df):
+        self.columns = list(df.columns[3:])
+        # Non-numeric or missing cells count as 0, like the old per-cell float() fallback
+        self.values = df[self.columns].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        self.row_by_ndb = {}
+        for row, ndb in enumerate(df[df.columns[2]]):
+            if pd.notna(ndb):
+                # First row wins for duplicated NDB numbers
+                self.row_by_ndb.setdefault(int(ndb), row)
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        return cls(pd.read_csv(csv_path))
+
+    def __len__(self):
+        return len(self.values)
+
+    def _gather(self, log_data):
+        rows, grams = [], []
+        for key, entry in log_data.items():
+            row = self.row_by_ndb.get(int(key))
+            if row is None:
+                continue
+            rows.append(row)
+            grams.append(entry["amount_gm"])
+        return rows, grams
+
+    def vector(self, log_data):
+        """Total nutrients of a parsed log ({ndb: {"amount_gm": ...}}) as an array."""
+        rows, grams = self._gather(log_data)
+        if not rows:
+            return np.zeros(len(self.columns))
+        return np.asarray(grams, dtype=np.float64) / 100 @ self.values[rows]
+
+    def totals(self, log_data):
+        """Total nutrients of a parsed log keyed by column name (Data.*)."""
+        return self.to_dict(self.vector(log_data))
+
+    def totals_many(self, logs):
+        """Totals for a batch of logs with one gather and one matrix product."""
+        weights = {}
+        rows = []
+        entries = []
+        for i, log_data in enumerate(logs):
+            for row, grams in zip(*self._gather(log_data)):
+                if row not in weights:
+                    weights[row] = len(rows)
+                    rows.append(row)
+                entries.append((i, weights[row], grams))
+        amounts = np.zeros((len(logs), len(rows)))
+        for i, j, grams in entries:
+            amounts[i, j] += grams / 100
+        matrix = amounts @ self.values[rows] if rows else np.zeros((len(logs), len(self.columns)))
+        return [self.to_dict(vector) for vector in matrix]
+
+    def to_dict(self, vector):
+        return {col: float(value) for col, value in zip(self.columns, vector)}
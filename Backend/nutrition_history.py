@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from baseline import NUTRIENT_MAPPING
+from db import db
+from models.user_nutrition import ALLOWED_NUTRIENTS, UserNutrition
+
+NUTRITION_COLLECTION = "user_nutrition"
+ROLLUP_PERIODS = ("day", "week", "month")
+# Deleting time-series documents by meal_id (not the metaField) needs MongoDB 7.0
+TIMESERIES_MIN_VERSION = [7, 0]
+
+
+async def ensure_nutrition_collection():
+    """Create user_nutrition as a time-series collection where the server can also delete from it.
+
+    Older servers get a plain collection. The (user_id, timestamp) index comes
+    from indexes.INDEXES either way.
+    """
+    server = await db.client.server_info()
+    if server.get("versionArray", [0])[:2] < TIMESERIES_MIN_VERSION:
+        return  # a plain collection is created on first insert
+    try:
+        await db.create_collection(
+            NUTRITION_COLLECTION,
+            timeseries={"timeField": "timestamp", "metaField": "user_id", "granularity": "hours"},
+        )
+    except CollectionInvalid:
+        pass  # already exists
+    except OperationFailure:
+        pass  # server without time-series support: a plain collection is created on first insert
+
+
+async def record_meal(user_id, totals, meal_id=None, timestamp=None):
+    """Store one parsed meal's totals (Data.* keys) as a UserNutrition document."""
+    nutrients = {name: totals.get(key, 0) for key, name in NUTRIENT_MAPPING.items()}
+    record = UserNutrition(user_id=user_id, nutrients=nutrients, meal_id=meal_id,
+                           timestamp=timestamp or datetime.utcnow())
+    await db[NUTRITION_COLLECTION].insert_one(record.dict())
+
+
+async def delete_meal_record(user_id, meal_id):
+    """Remove a deleted meal's history record so the rollups stop counting it."""
+    await db[NUTRITION_COLLECTION].delete_one({"user_id": user_id, "meal_id": meal_id})
+
+
+def period_start(date, period):
+    """Expression for the start (UTC) of the day/week/month containing date.
+
+    Built from $dateFromParts rather than $dateTrunc (MongoDB 5.0+), so the plain
+    collection used on older servers can be rolled up too. Weeks start on Sunday.
+    """
+    if period == "month":
+        return {"$dateFromParts": {"year": {"$year": date}, "month": {"$month": date}}}
+    day = {"$dateFromParts": {"year": {"$year": date}, "month": {"$month": date}, "day": {"$dayOfMonth": date}}}
+    if period == "week":
+        # $dayOfWeek is 1 for Sunday; step back that many whole days (in ms)
+        return {"$subtract": [day, {"$multiply": [{"$subtract": [{"$dayOfWeek": date}, 1]}, 24 * 60 * 60 * 1000]}]}
+    return day
+
+
+def rollup_pipeline(user_id, period, since):
+    """Daily totals per user, then the average day within each period, all server side."""
+    daily_sums = {name: {"$sum": f"$nutrients.{name}"} for name in ALLOWED_NUTRIENTS}
+    period_avgs = {name: {"$avg": f"${name}"} for name in ALLOWED_NUTRIENTS}
+    return [
+        {"$match": {"user_id": user_id, "timestamp": {"$gte": since}}},
+        {"$group": {
+            "_id": period_start("$timestamp", "day"),
+            "meals": {"$sum": 1},
+            **daily_sums,
+        }},
+        {"$group": {
+            "_id": period_start("$_id", period),
+            "days": {"$sum": 1},
+            "meals": {"$sum": "$meals"},
+            **period_avgs,
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+async def rollup(user_id, period="day", days=30):
+    since = datetime.utcnow() - timedelta(days=days)
+    results = []
+    async for doc in db[NUTRITION_COLLECTION].aggregate(rollup_pipeline(user_id, period, since)):
+        start = doc.pop("_id")
+        results.append({
+            "start": start.isoformat(),
+            "days": doc.pop("days"),
+            "meals": doc.pop("meals"),
+            "averages": doc,
+        })
+    return results
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from catalog import get_catalog, load_catalog
+
+# "thread" keeps one shared catalog; "process" sidesteps the GIL with a catalog per worker
+PARSE_POOL_KIND = os.getenv("PARSE_POOL_KIND", "thread")
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to be running or waiting before new ones are rejected
+PARSE_QUEUE_LIMIT = int(os.getenv("PARSE_QUEUE_LIMIT", "64"))
+
+
+class ParsePoolFull(Exception):
+    pass
+
+
+def _warm_worker():
+    load_catalog()
+
+
+def parse_and_total(user_input):
+    """Parse one input and total its nutrients. Runs inside a pool worker."""
+    catalog = get_catalog()
+    log_data = catalog.parser.parse_input(user_input)
+    return log_data, catalog.nutrients.totals(log_data)
+
+
+def parse_and_total_many(user_inputs):
+    """Parse a batch of inputs and return per-log totals. Runs inside a pool worker."""
+    catalog = get_catalog()
+    return catalog.nutrients.totals_many(catalog.parser.parse_many(user_inputs))
+
+
+class ParsePool:
+    """Runs CPU-bound parsing off the event loop with a bounded number of pending jobs."""
+
+    def __init__(self, kind=PARSE_POOL_KIND, workers=PARSE_POOL_WORKERS, queue_limit=PARSE_QUEUE_LIMIT):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown parse pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = None
+        # Serializes start/restart/shutdown, which run in worker threads
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def _build_executor(self):
+        """A new executor whose workers already hold the catalog."""
+        if self.kind == "process":
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+            # Start every worker now so the first requests don't pay for loading the CSVs
+            for future in [executor.submit(_warm_worker) for _ in range(self.workers)]:
+                future.result()
+            return executor
+        load_catalog()
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+
+    def start(self):
+        """Create the workers; blocking, so call it off the event loop (the lifespan hook does)."""
+        with self._lock:
+            if self.executor is None:
+                self.executor = self._build_executor()
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def restart(self):
+        """Replace process workers so they load the current catalog; thread workers already share it.
+
+        The old pool keeps serving until the new one is warm, then finishes the jobs it already has.
+        """
+        if self.kind != "process":
+            return
+        with self._lock:
+            if self.executor is None:
+                return
+            executor = self._build_executor()
+            old, self.executor = self.executor, executor
+        old.shutdown(wait=False)
+
+    async def run(self, fn, *args):
+        executor = self.executor
+        if executor is None:
+            raise RuntimeError("Parse pool is not started")
+        if self.pending >= self.queue_limit:
+            self.rejected += 1
+            raise ParsePoolFull()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, fn, *args)
+        except RuntimeError:
+            # Swapped out by restart() and shut down between reading and submitting
+            if self.executor is None or self.executor is executor:
+                raise
+            future = loop.run_in_executor(self.executor, fn, *args)
+        self.pending += 1
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+
+parse_pool = ParsePool()
+
+
+def get_parse_pool():
+    """FastAPI dependency returning the shared parse pool."""
+    return parse_pool
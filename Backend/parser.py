@@ -1,12 +1,18 @@
 import nltk
+import os
 import pandas as pd
 import re
 import json
-from difflib import get_close_matches
 from datetime import datetime
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import string
+from food_index import TokenIndex, TrigramIndex
+from normalizer import TextNormalizer
+from cache import LRUCache
+
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "4096"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "3600"))
 
 # Download required NLTK data (run once)
 try:
@@ -17,13 +23,21 @@ except LookupError:
     nltk.download('stopwords')
 
 class NutritionParser:
-    def __init__(self, csv_file_path):
+    def __init__(self, csv_file_path, fuzzy_cutoff=0.3,
+                 cache_size=MATCH_CACHE_SIZE, cache_ttl=MATCH_CACHE_TTL):
         """Initialize the nutrition parser with the food dataset."""
         # Load CSV and handle potential NaN values
         self.df = pd.read_csv(csv_file_path)
         # Fill NaN in Description with empty string and convert to string
         self.df['Description'] = self.df['Description'].fillna('').astype(str)
         self.stop_words = set(stopwords.words('english'))
+        # Token -> row postings over Description, replaces scanning every row per item
+        self.token_index = TokenIndex(self.df['Description'])
+        # Trigram index for the fuzzy fallback, replaces difflib over every description
+        self.fuzzy_index = TrigramIndex(self.df['Description'], cutoff=fuzzy_cutoff)
+        # Normalized description -> (row, score); belongs to this parser's data,
+        # so a catalog reload starts with an empty cache
+        self.match_cache = LRUCache("parser_matches", maxsize=cache_size, ttl=cache_ttl, register=False)
         
         # Bangladeshi food translation dictionary
         self.bangla_food_mapping = {
@@ -61,16 +75,12 @@ class NutritionParser:
             r'(\d+(?:\.\d+)?)\s*plates?': ('plate', 1.0),
             r'some|little|bit': ('some', 1.0),
         }
+        self.normalizer = TextNormalizer(self.bangla_food_mapping, self.quantity_patterns)
     
     def preprocess_text(self, text):
         """Preprocess and clean the input text."""
-        text = text.lower()
-        # Apply Bangla to English mapping
-        for bangla_word, english_word in self.bangla_food_mapping.items():
-            text = re.sub(r'\b' + bangla_word + r'\b', english_word, text)
-        # Clean special characters but keep spaces and dots
-        text = re.sub(r'[^\w\s\.]', ' ', text)
-        return text
+        # Bangla to English mapping and special character cleanup in one compiled pass
+        return self.normalizer.normalize(text)
     
     def extract_food_items(self, text):
         """Extract food items and their quantities from slash-separated text."""
@@ -86,19 +96,8 @@ class NutritionParser:
             # Preprocess the individual item
             processed_item = self.preprocess_text(item)
             
-            # Extract quantity information
-            quantity_info = self.extract_quantity(processed_item)
-            
-            # Remove quantity patterns from the food description
-            food_description = processed_item
-            for pattern in self.quantity_patterns.keys():
-                food_description = re.sub(pattern, '', food_description, flags=re.IGNORECASE)
-            
-            # Remove any standalone numbers that weren't caught by quantity patterns
-            food_description = re.sub(r'\b\d+(?:\.\d+)?\b', '', food_description)
-            
-            # Clean up extra whitespace
-            food_description = ' '.join(food_description.split())
+            # Extract the quantity and strip it from the description in one scan
+            quantity_info, food_description = self.normalizer.split_quantity(processed_item)
             
             if food_description:
                 food_items.append({
@@ -112,50 +111,35 @@ class NutritionParser:
     
     def extract_quantity(self, phrase):
         """Extract quantity and unit from a phrase."""
-        for pattern, (unit, _) in self.quantity_patterns.items():
-            match = re.search(pattern, phrase, re.IGNORECASE)
-            if match:
-                if unit == 'some':
-                    return {'amount': 1.0, 'unit': 'serving'}
-                else:
-                    amount = float(match.group(1)) if match.group(1) else 1.0
-                    return {'amount': amount, 'unit': unit}
-        
-        # If no quantity pattern found, default to 1 serving
-        return {'amount': 1.0, 'unit': 'serving'}
+        quantity_info, _ = self.normalizer.split_quantity(phrase)
+        return quantity_info
     
     def find_best_match(self, food_description):
         """Find the best matching food item in the dataset."""
+        cached = self.match_cache.get(food_description)
+        if cached is None:
+            cached = self.match_row(food_description)
+            self.match_cache.set(food_description, cached)
+        best_row, best_score = cached
+        best_match = self.df.iloc[best_row] if best_row is not None else None
+        return best_match, best_score
+    
+    def match_row(self, food_description):
+        """Return (row position, score) of the best match, or (None, score)."""
         tokens = word_tokenize(food_description.lower())
         tokens = [token for token in tokens if token not in self.stop_words and token not in string.punctuation]
         
-        best_match = None
-        best_score = 0
-        
-        # First pass: token-based matching
-        for idx, row in self.df.iterrows():
-            description = row['Description'].lower()
-            if not description:
-                continue
-            
-            # Count how many tokens match
-            score = sum(1 for token in tokens if token in description)
-            if tokens:
-                score = score / len(tokens)
-            
-            if score > best_score:
-                best_score = score
-                best_match = row
+        # First pass: token-based matching, only rows sharing a token are scored
+        best_row, best_score = self.token_index.best_match(tokens)
         
         # Second pass: if score is too low, try fuzzy matching
         if best_score < 0.3:
-            descriptions = self.df['Description'].tolist()
-            matches = get_close_matches(food_description, descriptions, n=1, cutoff=0.3)
+            matches = self.fuzzy_index.search(food_description, k=1)
             if matches:
-                best_match = self.df[self.df['Description'] == matches[0]].iloc[0]
+                best_row = matches[0][0]
                 best_score = 0.5  # Give it a reasonable score
         
-        return best_match, best_score
+        return best_row, best_score
     
     def convert_to_grams(self, amount, unit, food_row):
         """Convert the given amount and unit to grams using household measures."""
@@ -215,24 +199,47 @@ class NutritionParser:
             if match is not None:
                 print(f"Best match: {match['Description']} (score: {score:.2f})")
                 
-                amount_grams = self.convert_to_grams(
-                    item['quantity'], 
-                    item['unit'], 
-                    match
-                )
+                nutrient_id, entry = self.build_log_entry(item, match)
+                log_data[nutrient_id] = entry
                 
-                nutrient_id = str(int(match['Nutrient Data Bank Number']))
-                log_data[nutrient_id] = {
-                    'amount_gm': round(amount_grams, 1),
-                    'description': match['Description'].upper()
-                }
-                
-                print(f"Final: {amount_grams:.1f}g - {match['Description']}")
+                print(f"Final: {entry['amount_gm']:.1f}g - {match['Description']}")
             else:
                 print("No match found")
         
         return log_data
     
+    def build_log_entry(self, item, match):
+        """Return the (nutrient_id, log entry) pair for an extracted item and its matched row."""
+        amount_grams = self.convert_to_grams(item['quantity'], item['unit'], match)
+        nutrient_id = str(int(match['Nutrient Data Bank Number']))
+        return nutrient_id, {
+            'amount_gm': round(amount_grams, 1),
+            'description': match['Description'].upper()
+        }
+    
+    def parse_many(self, user_inputs):
+        """Parse a batch of inputs and return one log per input, in order.
+
+        Identical item descriptions across the whole batch are matched only once.
+        """
+        batch_items = [self.extract_food_items(user_input) for user_input in user_inputs]
+        matches = {}
+        for food_items in batch_items:
+            for item in food_items:
+                if item['description'] not in matches:
+                    matches[item['description']], _ = self.find_best_match(item['description'])
+        
+        logs = []
+        for food_items in batch_items:
+            log_data = {}
+            for item in food_items:
+                match = matches[item['description']]
+                if match is not None:
+                    nutrient_id, entry = self.build_log_entry(item, match)
+                    log_data[nutrient_id] = entry
+            logs.append(log_data)
+        return logs
+    
     def save_log(self, log_data, filename=None):
         """Save the nutrition log to a JSON file."""
         if filename is None:
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor for new hashes (passlib's default is 12); existing hashes keep their own
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Password operations admitted at once (running or queued on the pool); later callers wait
+PASSWORD_CONCURRENCY = int(os.getenv("PASSWORD_CONCURRENCY", str(PASSWORD_WORKERS * 4)))
+
+# One shared context: building a CryptContext per call re-runs passlib's backend setup
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so threads keep hashing off the event loop.
+# Created by start() in the app lifespan, so a later lifespan gets a fresh pool.
+_executor = None
+_slots = None
+
+
+def start():
+    global _executor, _slots
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password")
+        _slots = asyncio.Semaphore(PASSWORD_CONCURRENCY)
+
+
+async def _run(fn, *args):
+    if _executor is None:
+        raise RuntimeError("Password pool is not started")
+    async with _slots:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def hash_password(password):
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(plain_password, hashed_password):
+    if not hashed_password:
+        return False
+    return await _run(pwd_context.verify, plain_password, hashed_password)
+
+
+def shutdown():
+    global _executor, _slots
+    executor, _executor, _slots = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,61 @@
+import os
+from datetime import datetime
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from cache import LRUCache
+from db import db
+
+# Also write each user's state to MongoDB so it survives restarts and is shared across app processes
+PIPELINE_STATE_PERSIST = os.getenv("PIPELINE_STATE_PERSIST", "false").lower() in ("1", "true", "yes")
+# Users whose state is kept in memory; least recently used ones are dropped (and reread when persisted)
+PIPELINE_STATE_SIZE = int(os.getenv("PIPELINE_STATE_SIZE", "10000"))
+
+
+class PipelineStateStore:
+    """Per-user results carried from the analyze step to the shopping step.
+
+    Holds "analysis" (formerly nutrition_analysis.json), keyed by user id. Meal
+    logs and totals live in the meals and daily_totals collections.
+    """
+
+    def __init__(self, collection_name="pipeline_state", persist=PIPELINE_STATE_PERSIST, maxsize=PIPELINE_STATE_SIZE):
+        self.collection_name = collection_name
+        self.persist = persist
+        self._states = LRUCache(collection_name, maxsize=maxsize)
+
+    async def get(self, user_id):
+        state = self._states.get(user_id)
+        if state is None and self.persist:
+            state = await db[self.collection_name].find_one({"_id": user_id}, {"_id": 0})
+            if state is not None:
+                self._states.set(user_id, state)
+        return state or {}
+
+    async def update(self, user_id, **fields):
+        fields["updated_at"] = datetime.utcnow()
+        if self.persist:
+            # Cache the stored document, not just these fields, so a cold cache doesn't hide earlier writes
+            state = await db[self.collection_name].find_one_and_update(
+                {"_id": user_id}, {"$set": fields}, {"_id": 0},
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        else:
+            state = self._states.get(user_id) or {}
+            state.update(fields)
+        self._states.set(user_id, state)
+
+    def clear(self, user_id):
+        self._states.pop(user_id)
+
+
+pipeline_state = PipelineStateStore()
+
+
+async def resolve_user_id(email):
+    """User id for an email; 404 if there is no such user."""
+    user = await db["user"].find_one({"email": email}, {"_id": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return str(user["_id"])
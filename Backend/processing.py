@@ -1,23 +1,96 @@
+import asyncio
 import csv
+import re
+import time
+from typing import get_args, get_type_hints
+
+from pymongo import UpdateOne
+
 from db import db
 from models.food import Food
 
-async def import_food_csv(csv_path: str):
-	with open(csv_path, newline='', encoding='utf-8') as csvfile:
-		reader = csv.DictReader(csvfile)
-		foods = []
-		for row in reader:
-			# Convert numeric fields to float if possible
-			for k, v in row.items():
-				if v and k != "Nutrient Data Bank Number":
-					try:
-						row[k] = float(v)
-					except ValueError:
-						pass
-			food = Food(**row)
-			foods.append(food.dict(by_alias=True))
-		if foods:
-			await db["food"].insert_many(foods)
-			print(f"Inserted {len(foods)} food items into MongoDB.")
+NDB_FIELD = "Nutrient Data Bank Number"
+IMPORT_CHUNK_SIZE = 1000
+# Bulk writes allowed in flight at once
+IMPORT_MAX_IN_FLIGHT = 4
+# Checked up front rather than catching ValueError from float() on every cell
+NUMBER = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+def food_type_plan(model=Food):
+	"""(alias, type, required) for every model field, worked out once instead of per cell."""
+	hints = get_type_hints(model)
+	plan = []
+	for name, field in model.__fields__.items():
+		args = [arg for arg in get_args(hints[name]) if arg is not type(None)]
+		optional = len(args) < len(get_args(hints[name]))
+		plan.append((field.alias, args[0] if args else hints[name], not optional))
+	return plan
+
+
+def convert_row(row, plan):
+	"""A food document shaped like Food.dict(by_alias=True), or None if a required field is missing.
+
+	Numeric cells that don't parse become None. Columns the model doesn't know are dropped.
+	"""
+	doc = {}
+	for alias, kind, required in plan:
+		raw = row.get(alias) or ""
+		value = raw.strip()
+		if not value:
+			if required:
+				return None
+			doc[alias] = None
+		elif kind is float:
+			doc[alias] = float(value) if NUMBER.fullmatch(value) else None
 		else:
-			print("No food items found in CSV.")
\ No newline at end of file
+			doc[alias] = raw
+	return doc
+
+
+async def import_food_csv(csv_path: str, chunk_size=IMPORT_CHUNK_SIZE, max_in_flight=IMPORT_MAX_IN_FLIGHT):
+	"""Stream a food CSV into the food collection as upserts keyed on NDB number, so reruns don't duplicate."""
+	plan = food_type_plan()
+	stats = {"rows": 0, "upserted": 0, "modified": 0, "skipped": 0, "duplicates": 0}
+	seen = set()
+	in_flight = set()
+
+	async def write(ops):
+		# Unordered: one bad document doesn't stop the rest of the batch
+		result = await db["food"].bulk_write(ops, ordered=False)
+		stats["upserted"] += result.upserted_count
+		stats["modified"] += result.modified_count
+
+	start = time.perf_counter()
+	with open(csv_path, newline='', encoding='utf-8') as csvfile:
+		ops = []
+		for row in csv.DictReader(csvfile):
+			stats["rows"] += 1
+			doc = convert_row(row, plan)
+			if doc is None:
+				stats["skipped"] += 1
+				continue
+			# First row wins for a repeated NDB number, as in NutrientMatrix
+			if doc[NDB_FIELD] in seen:
+				stats["duplicates"] += 1
+				continue
+			seen.add(doc[NDB_FIELD])
+			ops.append(UpdateOne({NDB_FIELD: doc[NDB_FIELD]}, {"$set": doc}, upsert=True))
+			if len(ops) >= chunk_size:
+				if len(in_flight) >= max_in_flight:
+					done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+					for task in done:
+						task.result()  # surface write errors
+				in_flight.add(asyncio.create_task(write(ops)))
+				ops = []
+		if ops:
+			in_flight.add(asyncio.create_task(write(ops)))
+		await asyncio.gather(*in_flight)
+
+	elapsed = time.perf_counter() - start
+	stats["seconds"] = round(elapsed, 3)
+	stats["rows_per_sec"] = round(stats["rows"] / elapsed) if elapsed else 0
+	print(f"Imported {stats['rows']} rows from {csv_path} in {elapsed:.2f}s ({stats['rows_per_sec']} rows/sec): "
+	      f"{stats['upserted']} new, {stats['modified']} updated, "
+	      f"{stats['skipped']} skipped, {stats['duplicates']} duplicate NDB numbers")
+	return stats
@@ -6,9 +6,14 @@ from controllers.user_controller import (
     delete_all_users,
     update_user_info,
 )
-from controllers.parser_controller import parse_input_route
+from controllers.parser_controller import parse_input_route, parse_input_batch_route
+from controllers.catalog_controller import catalog_status, reload_catalog_route
+from controllers.metrics_controller import cache_metrics, auth_metrics, db_metrics
 from controllers.analyze_controller import analyze_log
-from controllers.calories_controller import analyze_calories
+from controllers.cohort_controller import analyze_cohort
+from controllers.history_controller import nutrition_history
+from controllers.meal_controller import get_daily_totals_route, delete_meal_route
+from controllers.calories_controller import analyze_calories, analyze_calories_all
 from controllers.chatbot_controller import router as chatbot_router
 from controllers.shopping_controller import router as shopping_router
 ## Removed shopping_routes import
@@ -24,9 +29,20 @@ router.post("/login")(login_user)
 router.post("/logout")(logout_user)
 router.put("/users/update")(update_user_info)
 router.post("/analyze/nutrients/email/{email}")(analyze_log)
+router.get("/analyze/cohort")(analyze_cohort)
+router.get("/nutrition/history/email/{email}")(nutrition_history)
+router.get("/meals/daily/email/{email}")(get_daily_totals_route)
+router.delete("/meals/email/{email}/{meal_id}")(delete_meal_route)
 router.get("/analyze/calories/email/{email}")(analyze_calories)
+router.get("/analyze/calories/all")(analyze_calories_all)
 router.get("/users/email/{email}")(get_user_by_email)
 router.post("/parse-input")(parse_input_route)
+router.post("/parse-input/batch")(parse_input_batch_route)
+router.get("/catalog/status")(catalog_status)
+router.post("/catalog/reload")(reload_catalog_route)
+router.get("/metrics/caches")(cache_metrics)
+router.get("/metrics/auth")(auth_metrics)
+router.get("/metrics/db")(db_metrics)
 
 
 # Gemini AI Chatbot endpoint
@@ -0,0 +1,329 @@
+import csv
+import os
+from bisect import bisect_right
+from itertools import count
+
+import numpy as np
+from scipy.optimize import linprog
+
+from cache import LRUCache
+from models.user_nutrition import ALLOWED_NUTRIENTS
+
+PRICES_CSV_PATH = "nutrient_with_prices.csv"
+PRIORITY_NUTRIENTS = ["Carbohydrates", "Protein"]
+PRIORITY_WEIGHT = 2.0
+# One bit per nutrient; 27 nutrients fit comfortably in a Python int
+NUTRIENT_BITS = {name: 1 << i for i, name in enumerate(ALLOWED_NUTRIENTS)}
+# Search nodes before the solver settles for the best plan found so far
+NODE_LIMIT = 200000
+EPS = 1e-9
+# Cover-mode plans are cached per budget bucket and solved for the bucket's floor;
+# every price is a multiple of 5, so the default step gives the same plans as exact budgets
+SHOPPING_BUDGET_STEP = float(os.getenv("SHOPPING_BUDGET_STEP", "5"))
+SHOPPING_CACHE_SIZE = int(os.getenv("SHOPPING_CACHE_SIZE", "4096"))
+# Quantity mode: prices in nutrient_with_prices.csv are taken to be per kg
+PRICE_UNIT_KG = 1.0
+# Most of any one food a daily plan may buy
+MAX_ITEM_KG = 0.5
+# Cost charged for leaving a whole nutrient gap open (scaled by the open fraction and priority)
+SHORTFALL_PENALTY = 10000.0
+# Quantities below this are dropped from the plan
+MIN_ITEM_GRAMS = 1.0
+
+
+def load_food_items(csv_path=PRICES_CSV_PATH):
+    """Rows of nutrient_with_prices.csv: Id, Food_Item, nutrient tags..., Price."""
+    food_items = []
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)  # skip header
+        for row in reader:
+            if len(row) < 4:
+                continue
+            food_items.append({
+                "id": row[0],
+                "name": row[1],
+                "nutrients": [n.strip() for n in row[2:-1]],
+                "price": int(row[-1])
+            })
+    return food_items
+
+
+def nutrient_mask(nutrients):
+    mask = 0
+    for nutrient in nutrients:
+        mask |= NUTRIENT_BITS.get(nutrient, 0)
+    return mask
+
+
+def budget_bucket(budget, step=SHOPPING_BUDGET_STEP):
+    return budget // step * step if step > 0 else budget
+
+
+def nutrient_weights(deficient_nutrients, priority=PRIORITY_NUTRIENTS, priority_weight=PRIORITY_WEIGHT):
+    """Weight per deficient nutrient; priority nutrients count more."""
+    return {n: (priority_weight if n in priority else 1.0) for n in deficient_nutrients if n in NUTRIENT_BITS}
+
+
+def greedy_select(food_items, deficient_nutrients, budget):
+    """The original heuristic: cheapest affordable item per deficient nutrient, in order."""
+    selected = []
+    budget_left = budget
+    for nutrient in deficient_nutrients:
+        candidates = [item for item in food_items if nutrient in item["nutrients"] and item["price"] <= budget_left]
+        if candidates:
+            best = min(candidates, key=lambda x: x["price"])
+            if best["name"] not in [f["name"] for f in selected]:
+                selected.append(best)
+                budget_left -= best["price"]
+    return selected
+
+
+class CoverSolver:
+    """Budgeted weighted max coverage over nutrient bitmasks, by branch and bound.
+
+    Maximizes the total weight of covered deficient nutrients within the budget
+    and, among equally good plans, minimizes cost. Exact unless the node limit is hit.
+    """
+
+    def __init__(self, masks, prices, weights, budget, node_limit=NODE_LIMIT):
+        self.weights = weights  # bit -> weight
+        self.target = 0
+        for bit in weights:
+            self.target |= bit
+        self.budget = budget
+        self.node_limit = node_limit
+        self._weight_cache = {}
+
+        candidates = [
+            (i, mask & self.target, price)
+            for i, (mask, price) in enumerate(zip(masks, prices))
+            if mask & self.target and price <= budget
+        ]
+        # Drop items dominated by one at most as expensive covering a superset
+        kept = []
+        for i, mask, price in candidates:
+            dominated = any(
+                (m | mask) == m and (p < price or (p == price and j < i))
+                for j, m, p in candidates if j != i
+            )
+            if not dominated:
+                kept.append((i, mask, price))
+        # Best value for money first, so good plans are found early and prune more
+        kept.sort(key=lambda c: (-self.weight(c[1]) / max(c[2], EPS), c[2], c[0]))
+        self.items = kept
+
+    def weight(self, mask):
+        value = self._weight_cache.get(mask)
+        if value is None:
+            value = sum(w for bit, w in self.weights.items() if mask & bit)
+            self._weight_cache[mask] = value
+        return value
+
+    def _min_cover_cost(self, needed, remaining):
+        """Lower bound on the cost of covering every bit in `needed` with `remaining` items."""
+        spread = 0.0  # each item's price shared among the needed bits it covers
+        hardest = 0   # the priciest bit to cover on its own
+        bits = needed
+        while bits:
+            bit = bits & -bits
+            bits ^= bit
+            cheapest = None
+            share = None
+            for mask, price in remaining:
+                if mask & bit:
+                    cheapest = price if cheapest is None else min(cheapest, price)
+                    per_bit = price / bin(mask & needed).count("1")
+                    share = per_bit if share is None else min(share, per_bit)
+            hardest = max(hardest, cheapest)
+            spread += share
+        return max(hardest, spread - EPS)
+
+    def solve(self):
+        self.best = (0.0, 0, ())  # (covered weight, cost, chosen item indices)
+        self.nodes = 0
+        self.exhausted = True
+        self._search(0, 0, 0, ())
+        value, cost, chosen = self.best
+        return {"indices": sorted(chosen), "weight": value, "cost": cost, "optimal": self.exhausted}
+
+    def _better(self, value, cost):
+        best_value, best_cost, _ = self.best
+        return value > best_value + EPS or (abs(value - best_value) <= EPS and cost < best_cost)
+
+    def _search(self, start, covered, cost, chosen):
+        self.nodes += 1
+        value = self.weight(covered)
+        if self._better(value, cost):
+            self.best = (value, cost, chosen)
+        if self.nodes > self.node_limit:
+            self.exhausted = False
+            return
+        budget_left = self.budget - cost
+        # Upper bound: everything still affordable gets covered at no extra cost
+        remaining = [(mask & ~covered, price) for _, mask, price in self.items[start:]
+                     if price <= budget_left and mask & ~covered]
+        reachable = covered
+        for mask, _ in remaining:
+            reachable |= mask
+        bound = self.weight(reachable)
+        best_value, best_cost, _ = self.best
+        if bound < best_value - EPS:
+            return
+        if bound <= best_value + EPS:
+            # Weights are positive, so tying the best plan means covering every
+            # reachable bit; it can only win by doing that for less
+            if reachable == covered or cost + self._min_cover_cost(reachable & ~covered, remaining) >= best_cost:
+                return
+        for k in range(start, len(self.items)):
+            i, mask, price = self.items[k]
+            if price > budget_left or not (mask & ~covered):
+                continue
+            self._search(k + 1, covered | mask, cost + price, chosen + (i,))
+            if self.nodes > self.node_limit:
+                self.exhausted = False
+                return
+
+
+_catalog_versions = count(1)
+
+
+class PriceCatalog:
+    """nutrient_with_prices.csv compiled for bitwise candidate lookup.
+
+    Each item has a nutrient bitmask; each nutrient has a bitmask of the items
+    providing it; items are also ranked by price so "affordable" is a prefix mask.
+    """
+
+    def __init__(self, food_items, nutrients=None, baseline=None):
+        self.items = food_items
+        # Part of every cached plan's key, so plans from an older price list never match
+        self.version = next(_catalog_versions)
+        self.plan_cache = LRUCache("shopping_plans", maxsize=SHOPPING_CACHE_SIZE, register=False)
+        self.masks = [nutrient_mask(item["nutrients"]) for item in food_items]
+        self.prices = [item["price"] for item in food_items]
+
+        order = sorted(range(len(food_items)), key=lambda i: self.prices[i])
+        self.sorted_prices = [self.prices[i] for i in order]
+        # affordable_masks[k]: item bitmask of the k cheapest items
+        self.affordable_masks = [0]
+        for i in order:
+            self.affordable_masks.append(self.affordable_masks[-1] | (1 << i))
+
+        # nutrient bit -> item bitmask
+        self.nutrient_items = {bit: 0 for bit in NUTRIENT_BITS.values()}
+        for i, mask in enumerate(self.masks):
+            for bit in self.nutrient_items:
+                if mask & bit:
+                    self.nutrient_items[bit] |= 1 << i
+
+        # Quantity mode: baseline nutrients per kg of each item, joined on NDB number (Id)
+        self.amounts = None
+        if nutrients is not None and baseline is not None:
+            self.amounts = np.zeros((len(food_items), len(baseline.keys)))
+            for i, item in enumerate(food_items):
+                row = nutrients.row_by_ndb.get(int(item["id"]))
+                if row is not None:
+                    # food.csv is per 100 g
+                    self.amounts[i] = nutrients.values[row, baseline.column_index] * 10 / PRICE_UNIT_KG
+            self.amount_names = baseline.names
+            self.price_array = np.asarray(self.prices, dtype=np.float64)
+
+    @classmethod
+    def from_csv(cls, csv_path=PRICES_CSV_PATH, nutrients=None, baseline=None):
+        return cls(load_food_items(csv_path), nutrients, baseline)
+
+    def __len__(self):
+        return len(self.items)
+
+    def candidates(self, deficiency_mask, budget):
+        """Item bitmask of affordable items providing at least one deficient nutrient."""
+        providers = 0
+        for bit, items in self.nutrient_items.items():
+            if deficiency_mask & bit:
+                providers |= items
+        return providers & self.affordable_masks[bisect_right(self.sorted_prices, budget)]
+
+    def select(self, deficient_nutrients, budget, priority=PRIORITY_NUTRIENTS,
+               priority_weight=PRIORITY_WEIGHT, node_limit=NODE_LIMIT):
+        """Items covering the most (weighted) deficient nutrients within budget, cheapest such plan."""
+        weights = {NUTRIENT_BITS[n]: w for n, w in nutrient_weights(deficient_nutrients, priority, priority_weight).items()}
+        deficiency_mask = nutrient_mask(deficient_nutrients)
+        candidates = self.candidates(deficiency_mask, budget)
+        indices = [i for i in range(len(self.items)) if candidates >> i & 1]
+        solver = CoverSolver(
+            [self.masks[i] for i in indices],
+            [self.prices[i] for i in indices],
+            weights,
+            budget,
+            node_limit,
+        )
+        result = solver.solve()
+        result["indices"] = sorted(indices[i] for i in result["indices"])
+        return [self.items[i] for i in result["indices"]], result
+
+    def select_cached(self, deficient_nutrients, budget):
+        """select() with default weights, memoized on (deficiency bitmask, budget bucket, version)."""
+        bucket = budget_bucket(budget)
+        key = (nutrient_mask(deficient_nutrients), bucket, self.version)
+        result = self.plan_cache.get(key)
+        if result is None:
+            result = self.select(deficient_nutrients, bucket)
+            self.plan_cache.set(key, result)
+        return result
+
+    def quantity_plan(self, gap, room=None, budget=None, priority=PRIORITY_NUTRIENTS, priority_weight=PRIORITY_WEIGHT,
+                      max_kg=MAX_ITEM_KG, penalty=SHORTFALL_PENALTY):
+        """Cheapest purchase quantities closing nutrient gaps, as a linear program.
+
+        gap holds baseline minus intake in baseline (NUTRIENT_MAPPING) order and
+        room what is left below UL (NaN for no limit). Each open gap gets a slack
+        variable for the fraction left unmet, charged at penalty, so gaps the
+        catalog, budget or limits cannot close still give a plan.
+        """
+        if self.amounts is None:
+            raise ValueError("Price catalog was built without nutrient data")
+        open_gaps = np.flatnonzero(gap > EPS)
+        n, k = len(self.items), len(open_gaps)
+        if k == 0:
+            return {"items": [], "total_cost": 0.0, "shortfall": {}}
+
+        # Rows scaled by the gap so every constraint reads "fraction closed + slack >= 1"
+        coverage = self.amounts[:, open_gaps].T / gap[open_gaps][:, None]
+        weights = np.array([priority_weight if self.amount_names[j] in priority else 1.0 for j in open_gaps])
+        c = np.concatenate([self.price_array, penalty * weights])
+        a_ub = np.hstack([-coverage, -np.eye(k)])
+        b_ub = -np.ones(k)
+        if room is not None:
+            # Stay under UL: amounts bought <= room
+            limited = np.flatnonzero(~np.isnan(room))
+            a_ub = np.vstack([a_ub, np.hstack([self.amounts[:, limited].T, np.zeros((len(limited), k))])])
+            b_ub = np.concatenate([b_ub, room[limited]])
+        if budget is not None:
+            a_ub = np.vstack([a_ub, np.concatenate([self.price_array, np.zeros(k)])])
+            b_ub = np.append(b_ub, budget)
+        bounds = [(0, max_kg)] * n + [(0, 1)] * k
+
+        result = linprog(c, A_ub=a_ub, b_ub=b_ub, bounds=bounds, method="highs")
+        if result.status != 0:
+            raise ValueError(f"Quantity plan failed: {result.message}")
+
+        kg, slack = result.x[:n], result.x[n:]
+        items = []
+        for i in np.flatnonzero(kg * 1000 >= MIN_ITEM_GRAMS):
+            items.append({
+                **self.items[i],
+                "quantity_g": round(float(kg[i]) * 1000, 1),
+                "cost": round(float(kg[i] * self.price_array[i]), 2),
+            })
+        return {
+            "items": items,
+            "total_cost": round(sum(item["cost"] for item in items), 2),
+            # Fraction of each gap left open
+            "shortfall": {self.amount_names[j]: round(float(s), 4) for j, s in zip(open_gaps, slack) if s > 1e-6},
+        }
+
+
+def optimal_select(food_items, deficient_nutrients, budget, **options):
+    """One-off solve over a list of food items (see PriceCatalog.select)."""
+    return PriceCatalog(food_items).select(deficient_nutrients, budget, **options)